@@ -0,0 +1,116 @@
+"""
+Create slot-lock documents (slot_locks/{date}T{start_time}) for confirmed
+bookings made before book_sessions started writing them.
+
+book_sessions detects conflicts by checking whether the lock exists, so a
+confirmed booking without one could be double-booked. Run this once after
+deploying the slot-lock change. It is safe to re-run: existing locks are
+left alone, and locks whose booking has since been cancelled are removed.
+
+It can run against the live app. Locks and bookings are read at
+different times, so a lock missing from the bookings snapshot may belong
+to a booking made in between. Each such lock is therefore re-checked in
+its own transaction, and removed only if its booking is missing or no
+longer confirmed.
+
+Usage:
+    python scripts/backfill_slot_locks.py            # today onwards
+    python scripts/backfill_slot_locks.py --all      # past bookings too
+    python scripts/backfill_slot_locks.py --dry-run  # report, write nothing
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+from services import services
+
+BATCH_SIZE = 400  # Firestore allows 500 writes per batch
+
+
+def remove_if_stale(db, lock_ref):
+    """Delete the lock if its booking is missing or not confirmed, checked in
+    a transaction so a booking made since the snapshot keeps its lock."""
+    @firestore.transactional
+    def _remove(transaction):
+        lock = next(transaction.get(lock_ref))
+        if not lock.exists:
+            return False
+        booking_id = lock.to_dict().get("booking_id")
+        if not booking_id:
+            return False  # can't tell which booking it guards; leave it
+        booking = next(transaction.get(db.collection("bookings").document(booking_id)))
+        if booking.exists and booking.to_dict().get("status") == "confirmed":
+            return False
+        transaction.delete(lock_ref)
+        return True
+
+    return _remove(db.transaction())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--all', action='store_true', help='include bookings before today')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change, write nothing')
+    args = parser.parse_args()
+
+    svc = services.booking()
+    db = svc.db
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    query = db.collection("bookings").where(filter=FieldFilter("status", "==", "confirmed"))
+    if not args.all:
+        query = query.where(filter=FieldFilter("date", ">=", today))
+    confirmed = {}
+    for doc in query.select(["date", "start_time", "user_uid"]).stream():
+        b = doc.to_dict()
+        confirmed.setdefault(svc._slot_lock_ref(b["date"], b["start_time"]).id, (doc.id, b))
+
+    existing = {}
+    for doc in db.collection("slot_locks").stream():
+        lock = doc.to_dict()
+        if args.all or lock.get("date", "") >= today:
+            existing[doc.id] = lock.get("booking_id")
+
+    missing = [key for key in confirmed if key not in existing]
+    stale = [key for key in existing if key not in confirmed]
+    print(f"{len(confirmed)} confirmed bookings, {len(existing)} locks: "
+          f"{len(missing)} missing, {len(stale)} stale")
+
+    if args.dry_run:
+        for key in missing:
+            print(f"  + {key}")
+        for key in stale:
+            print(f"  - {key}")
+        return
+
+    batch, pending = db.batch(), 0
+    for key in missing:
+        booking_id, b = confirmed[key]
+        batch.set(svc._slot_lock_ref(b["date"], b["start_time"]), {
+            "date": b["date"],
+            "start_time": b["start_time"],
+            "booking_id": booking_id,
+            "user_uid": b.get("user_uid", ""),
+            "created_at": datetime.utcnow(),
+        })
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+
+    removed = sum(remove_if_stale(db, db.collection("slot_locks").document(key)) for key in stale)
+    print(f"Done! Created {len(missing)} locks, removed {removed} "
+          f"({len(stale) - removed} stale candidates turned out to be live).")
+
+
+if __name__ == "__main__":
+    main()
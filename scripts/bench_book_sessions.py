@@ -0,0 +1,168 @@
+"""
+Benchmark: whole book_sessions calls, commit and retries included, as pack
+size and concurrent bookers grow.
+
+Runs against the in-memory Firestore (scripts/fake_firestore.py) with a
+simulated round-trip latency. Its transactions abort and retry when a
+document they read was written before they committed, like contended
+Firestore transactions. Every booker books its own weekly slot in the
+same months, so bookings never conflict on a slot, only on shared
+documents.
+
+It compares the old booking transaction (user get, one conflict query
+per date, and the month calendar documents read and written in the
+transaction) with BookingService.book_sessions. The new version reads the
+user and one slot lock per date in a single get_all, and syncs the month
+calendars in their own transactions after commit. The numbers to watch:
+
+- aborts: commits that had to retry. For the new version they are split
+  into the booking transaction's and the calendar sync's.
+- failed: bookings that ran out of retries and raised.
+- queued: calendar syncs that ran out of retries and went to the job
+  queue. They are run at the end, and the month documents are then
+  checked against the slot locks.
+- ms: wall time per booking.
+
+Usage:
+    python scripts/bench_book_sessions.py [--latency-ms 5] [--packs 1,5,10] [--bookers 1,8,16]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+import slot_calendar
+from booking_service import SLOT_SYNC_JOB, BookingService
+from fake_firestore import FakeFirestore
+
+FIRST_DAY = date(2026, 11, 2)
+
+
+def legacy_book(svc, user_uid, start_time, end_time, duration_minutes, dates):
+    """The booking transaction before slot locks."""
+    @firestore.transactional
+    def _book(transaction, user_ref):
+        user_doc = user_ref.get(transaction=transaction)
+        if not user_doc.exists:
+            raise ValueError("User not found")
+        user = user_doc.to_dict()
+        if user.get("sessions_remaining", 0) < len(dates):
+            raise ValueError("Not enough credits")
+        for d in dates:
+            existing = (
+                svc.db.collection("bookings")
+                .where(filter=FieldFilter("date", "==", d))
+                .where(filter=FieldFilter("start_time", "==", start_time))
+                .where(filter=FieldFilter("status", "==", "confirmed"))
+                .limit(1)
+                .stream()
+            )
+            if next(existing, None):
+                raise ValueError(f"Slot on {d} at {start_time} is already booked")
+        calendars = []
+        for year, month in sorted({(int(d[:4]), int(d[5:7])) for d in dates}):
+            ref = svc._calendar_ref(year, month)
+            snap = ref.get(transaction=transaction)
+            if snap.exists:
+                calendars.append((ref, snap.to_dict()))
+        for d in dates:
+            booking_id = str(uuid.uuid4())
+            transaction.set(svc.db.collection("bookings").document(booking_id), {
+                "id": booking_id, "user_uid": user_uid, "date": d, "start_time": start_time,
+                "end_time": end_time, "duration_minutes": duration_minutes, "status": "confirmed",
+            })
+        transaction.update(user_ref, {"sessions_remaining": firestore.Increment(-len(dates))})
+        keys = [slot_calendar.slot_key(d, start_time) for d in dates]
+        for ref, doc in calendars:
+            slot_calendar.mark_booked(doc, keys)
+            transaction.set(ref, doc)
+
+    _book(svc.db.transaction(), svc.db.collection("users").document(user_uid))
+
+
+def new_book(svc, user_uid, start_time, end_time, duration_minutes, dates):
+    svc.book_sessions(user_uid, start_time, end_time, duration_minutes, dates)
+
+
+def setup(latency, bookers, pack):
+    db = FakeFirestore()
+    svc = BookingService(db=db)
+    svc.jobs.workers = 0  # calendar jobs aren't part of this measurement
+    for dow in range(7):
+        svc.create_availability(dow, "08:00", "20:00", 60)
+    last = FIRST_DAY + timedelta(weeks=pack, days=7)
+    svc.get_available_range(FIRST_DAY.isoformat(), last.isoformat())  # build the month documents
+    for i in range(bookers):
+        db.collection("users").document(f"user-{i}").set({"uid": f"user-{i}", "sessions_remaining": pack})
+    db.latency = latency
+    return db, svc
+
+
+def calendar_matches_locks(db):
+    locked = {slot_calendar.slot_key(*doc_id.split("T")) for doc_id in db.data.get("slot_locks", {})}
+    booked = {key for doc in db.data.get("slot_calendar", {}).values() for key in doc["booked"]}
+    return locked == booked
+
+
+def run(book, latency, bookers, pack):
+    """Every booker books concurrently; returns
+    (booking aborts, sync aborts, failures, queued syncs, consistent, ms per booking)."""
+    db, svc = setup(latency, bookers, pack)
+
+    def one(i):
+        dates = [(FIRST_DAY + timedelta(days=i % 7, weeks=w)).isoformat() for w in range(pack)]
+        start_time = f"{8 + i // 7:02d}:00"
+        started = time.perf_counter()
+        try:
+            book(svc, f"user-{i}", start_time, f"{9 + i // 7:02d}:00", 60, dates)
+            failed = 0
+        except ValueError:
+            failed = 1
+        return failed, (time.perf_counter() - started) * 1000
+
+    db.reset_counters()
+    with ThreadPoolExecutor(max_workers=bookers) as pool:
+        results = list(pool.map(one, range(bookers)))
+    failures = sum(failed for failed, _ in results)
+    ms = sum(ms for _, ms in results) / len(results)
+
+    if book is legacy_book:
+        return db.aborts, 0, failures, 0, calendar_matches_locks(db), ms
+    sync_aborts = db.conflicts.get("slot_calendar", 0)
+    queued = [job_id for job_id, job in db.data.get("jobs", {}).items() if job["kind"] == SLOT_SYNC_JOB]
+    db.latency = 0
+    for job_id in queued:
+        svc.jobs.run(job_id)
+    return db.aborts - sync_aborts, sync_aborts, failures, len(queued), calendar_matches_locks(db), ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='simulated round-trip latency')
+    parser.add_argument('--packs', default='1,5,10', help='sessions per booking to try')
+    parser.add_argument('--bookers', default='1,8,16', help='concurrent bookers to try')
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(f"{'':>14} | {'old':^21} | {'new':^42}")
+    print(f"{'pack':>5}{'bookers':>9} | {'aborts':>7}{'failed':>7}{'ms':>7} | "
+          f"{'aborts':>7}{'(sync)':>7}{'failed':>7}{'queued':>7}{'ms':>7}{'synced':>7}")
+    for bookers in [int(b) for b in args.bookers.split(',')]:
+        for pack in [int(p) for p in args.packs.split(',')]:
+            old_aborts, _, old_failed, _, _, old_ms = run(legacy_book, latency, bookers, pack)
+            new_aborts, sync_aborts, new_failed, queued, synced, new_ms = run(new_book, latency, bookers, pack)
+            print(f"{pack:>5}{bookers:>9} | {old_aborts:>7}{old_failed:>7}{old_ms:>7.0f} | "
+                  f"{new_aborts:>7}{sync_aborts:>7}{new_failed:>7}{queued:>7}{new_ms:>7.0f}{'yes' if synced else 'NO':>7}")
+
+if __name__ == "__main__":
+    main()
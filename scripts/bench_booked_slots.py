@@ -0,0 +1,87 @@
+"""
+Benchmark: Firestore reads for one month's booked slots as history grows.
+
+Seeds an in-memory Firestore (scripts/fake_firestore.py) with N months of
+confirmed bookings, then counts the document reads and time needed to
+compute one month's booked (date, start_time) set. It compares the old
+query, which streams every confirmed booking and filters in Python,
+against BookingService._get_booked_slots, which runs a range query on
+date. Read counts are the number to watch. The fake has no
+indexes and scans every document, so its timings still grow with history.
+
+Usage:
+    python scripts/bench_booked_slots.py [--per-month N] [--months 1,12,60,240]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from google.cloud.firestore_v1 import FieldFilter
+
+import slot_calendar
+from booking_service import BookingService
+from fake_firestore import FakeFirestore
+
+TARGET = (2026, 6)
+
+
+def legacy_booked_dates(db, year, month):
+    """The pre-range-query implementation."""
+    start, end = slot_calendar.month_bounds(year, month)
+    docs = db.collection("bookings").where(filter=FieldFilter("status", "==", "confirmed")).stream()
+    booked = set()
+    for doc in docs:
+        b = doc.to_dict()
+        if start <= b.get("date", "") < end:
+            booked.add((b["date"], b["start_time"]))
+    return booked
+
+
+def seed(db, months, per_month):
+    """`months` months of history ending with TARGET, `per_month` bookings each."""
+    year, month = TARGET
+    for _ in range(months):
+        for i in range(per_month):
+            booking_id = str(uuid.uuid4())
+            db.collection("bookings").document(booking_id).set({
+                "id": booking_id,
+                "date": f"{year}-{month:02d}-{i % 28 + 1:02d}",
+                "start_time": f"{15 + i // 28 % 4}:00",
+                "status": "cancelled" if i % 10 == 0 else "confirmed",
+            })
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    db.reads = db.writes = 0
+
+
+def measure(db, fn):
+    db.reads = 0
+    started = time.perf_counter()
+    result = fn()
+    return result, db.reads, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--per-month', type=int, default=40, help='bookings per month of history')
+    parser.add_argument('--months', default='1,12,60,240', help='history lengths to try, in months')
+    args = parser.parse_args()
+
+    print(f"{'months':>7}{'bookings':>10}{'old reads':>11}{'new reads':>11}{'old ms':>9}{'new ms':>9}")
+    for months in [int(m) for m in args.months.split(',')]:
+        db = FakeFirestore()
+        seed(db, months, args.per_month)
+        svc = BookingService(db=db)
+        old, old_reads, old_ms = measure(db, lambda: legacy_booked_dates(db, *TARGET))
+        new, new_reads, new_ms = measure(db, lambda: svc._get_booked_slots(*slot_calendar.month_bounds(*TARGET)))
+        assert old == new, "range query returned different slots"
+        print(f"{months:>7}{months * args.per_month:>10}{old_reads:>11}{new_reads:>11}{old_ms:>9.1f}{new_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
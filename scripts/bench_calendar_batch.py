@@ -0,0 +1,88 @@
+"""
+Benchmark: Calendar round trips for an N-date booking, one request per
+event vs calendar_service.create_lesson_events' batch requests.
+
+Runs against the local fake Calendar API (scripts/fake_calendar.py) with a
+simulated round-trip latency. The old path inserts each event on its own
+and re-fetches it, a second apart, until its Meet link appears. The new
+path sends the inserts as one batch and re-fetches every event that is
+still missing a link in one batch per round. Use --meet-after to set how
+many fetches it takes before the fake reports a Meet link.
+
+Usage:
+    python scripts/bench_calendar_batch.py [--latency-ms 80] [--dates 1,5,10] [--meet-after 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_calendar import FakeCalendarServer
+
+
+def lessons_for(count, run):
+    return [
+        {'date': f"2027-{run % 12 + 1:02d}-{day + 1:02d}", 'start_time': '15:00', 'end_time': '16:00'}
+        for day in range(count)
+    ]
+
+
+def sequential(calendar_service, lessons):
+    """The pre-batch implementation: an insert and up to three polls per lesson."""
+    client = calendar_service.calendar_client
+    service = client.service()
+    for lesson in lessons:
+        created = client.execute(service.events().insert(
+            calendarId=calendar_service.CALENDAR_ID,
+            body=calendar_service._lesson_event(lesson, 'student@example.com', 'Student'),
+            conferenceDataVersion=1,
+            sendUpdates='all',
+        ))
+        meet_link = calendar_service._extract_meet_link(created)
+        attempts = 0
+        while not meet_link and attempts < 3:
+            time.sleep(1)
+            attempts += 1
+            refreshed = client.execute(service.events().get(
+                calendarId=calendar_service.CALENDAR_ID, eventId=created['id']))
+            meet_link = calendar_service._extract_meet_link(refreshed)
+
+
+def batched(calendar_service, lessons):
+    calendar_service.create_lesson_events(lessons, 'student@example.com', 'Student')
+
+
+def measure(server, fn, *args):
+    server.reset_counters()
+    started = time.perf_counter()
+    fn(*args)
+    return server.round_trips, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='simulated round-trip latency')
+    parser.add_argument('--dates', default='1,5,10', help='dates per booking to try')
+    parser.add_argument('--meet-after', type=int, default=0, help='fetches before the Meet link appears')
+    args = parser.parse_args()
+
+    server = FakeCalendarServer(latency=args.latency_ms / 1000, meet_after=args.meet_after).start()
+    os.environ['GOOGLE_CALENDAR_EMULATOR_HOST'] = server.host
+    os.environ['GOOGLE_CALENDAR_ID'] = 'tutor@example.com'
+    import calendar_service
+    calendar_service.calendar_client.service()  # build the client outside the timings
+
+    print(f"{'dates':>6}{'old trips':>11}{'new trips':>11}{'old ms':>9}{'new ms':>9}")
+    for run, count in enumerate(int(d) for d in args.dates.split(',')):
+        old_trips, old_ms = measure(server, sequential, calendar_service, lessons_for(count, 2 * run))
+        new_trips, new_ms = measure(server, batched, calendar_service, lessons_for(count, 2 * run + 1))
+        print(f"{count:>6}{old_trips:>11}{new_trips:>11}{old_ms:>9.0f}{new_ms:>9.0f}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: single-pass HTML minifier vs the old three-regex chain.
+
+Runs both over the rendered index and photos pages plus every raw template
+under src/templates, and reports time per call and output size. The
+"streamed" column feeds the new minifier the page in Jinja-sized chunks.
+
+Usage:
+    python scripts/bench_minify.py [--runs N]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from html_minifier import minify_html, minify_stream
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'templates')
+
+
+def legacy_minify_html(html):
+    """The regex chain main.py used before the tokenizer."""
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    html = re.sub(r'>\s+<', '><', html)
+    html = re.sub(r'\s{2,}', ' ', html)
+    return html.strip()
+
+
+def load_documents():
+    docs = {}
+    try:
+        from main import app
+        from flask import render_template
+        with app.test_request_context('/'):
+            docs['index (rendered)'] = render_template('index.html', logged_in=False)
+            docs['photos (rendered)'] = render_template('photos.html')
+    except Exception as e:
+        print(f"Skipping rendered pages: {e}")
+    for path in sorted(glob.glob(os.path.join(TEMPLATES_DIR, '*.html'))):
+        with open(path) as f:
+            docs[os.path.basename(path)] = f.read()
+    return docs
+
+
+def chunks_of(text, size=512):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def per_call_us(fn, runs):
+    return min(timeit.repeat(fn, number=runs, repeat=5)) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=200, help='calls per timing sample')
+    args = parser.parse_args()
+
+    print(f"{'document':<28}{'bytes':>8}{'regex us':>10}{'single us':>11}{'streamed us':>13}{'regex out':>11}{'single out':>12}")
+    for name, html in load_documents().items():
+        chunks = chunks_of(html)
+        regex = per_call_us(lambda: legacy_minify_html(html), args.runs)
+        single = per_call_us(lambda: minify_html(html), args.runs)
+        streamed = per_call_us(lambda: ''.join(minify_stream(chunks)), args.runs)
+        print(
+            f"{name:<28}{len(html):>8}{regex:>10.1f}{single:>11.1f}{streamed:>13.1f}"
+            f"{len(legacy_minify_html(html)):>11}{len(minify_html(html)):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
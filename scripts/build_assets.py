@@ -0,0 +1,101 @@
+"""
+Pre-minify the site's JS/CSS into content-hashed files plus a manifest.
+
+Minifies everything under src/static/js (rjsmin) and src/static/css (cssmin)
+into src/static/dist/{js,css}/<name>.<hash>.<ext>, with .gz and (when the
+brotli package is installed) .br variants alongside, and writes
+src/static/dist/manifest.json. The app links assets through that manifest
+and serves the built bytes with immutable caching, so nothing is minified
+at request time. Re-run after editing any JS/CSS and commit the output.
+
+Usage:
+    python scripts/build_assets.py          # rebuild src/static/dist
+    python scripts/build_assets.py --check  # exit 1 if dist is out of date
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import cssmin
+import rjsmin
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from compression import AVAILABLE_ENCODINGS, EXTENSIONS, compress
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MINIFIERS = {'js': rjsmin.jsmin, 'css': cssmin.cssmin}
+
+
+def build():
+    """Returns {built_path: bytes} and the manifest {source_path: built_path}."""
+    outputs, manifest = {}, {}
+    for kind, minifier in MINIFIERS.items():
+        source_dir = os.path.join(STATIC_DIR, kind)
+        for root, _, files in os.walk(source_dir):
+            for name in sorted(files):
+                if not name.endswith(f'.{kind}'):
+                    continue
+                rel = os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, '/')
+                with open(os.path.join(root, name)) as f:
+                    data = minifier(f.read()).encode('utf-8')
+                digest = hashlib.sha256(data).hexdigest()[:10]
+                stem = rel[:-len(kind) - 1]
+                built = f"{stem}.{digest}.{kind}"
+                outputs[built] = data
+                for encoding in AVAILABLE_ENCODINGS:
+                    outputs[built + EXTENSIONS[encoding]] = compress(data, encoding)
+                manifest[rel] = built
+    return outputs, manifest
+
+
+def is_current(outputs, manifest):
+    try:
+        with open(os.path.join(DIST_DIR, 'manifest.json')) as f:
+            if json.load(f) != manifest:
+                return False
+    except (OSError, ValueError):
+        return False
+    return all(os.path.exists(os.path.join(DIST_DIR, built)) for built in outputs)
+
+
+def write(outputs, manifest):
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    for built, data in outputs.items():
+        path = os.path.join(DIST_DIR, built)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true', help='verify dist is up to date without writing')
+    args = parser.parse_args()
+
+    outputs, manifest = build()
+    if args.check:
+        if not is_current(outputs, manifest):
+            sys.exit("src/static/dist is out of date; run python scripts/build_assets.py")
+        print("src/static/dist is up to date.")
+        return
+
+    write(outputs, manifest)
+    for source, built in sorted(manifest.items()):
+        sizes = ', '.join(
+            f"{encoding} {len(outputs[built + EXTENSIONS[encoding]])}" for encoding in AVAILABLE_ENCODINGS
+        )
+        print(f"  {source} -> {built} ({len(outputs[built])} bytes; {sizes})")
+    print(f"Done! Built {len(manifest)} assets.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Check calendar_service.create_lesson_events against the local fake Calendar
+API (scripts/fake_calendar.py), covering the paths a real calendar rarely
+exercises:
+
+- an event that a previous attempt already created: the insert gets a 409
+  and the existing event is fetched instead of duplicated
+- one lesson in a batch failing while the others succeed
+- Meet links that never appear: polling stops after MEET_POLL_ATTEMPTS
+  re-fetch rounds and the lessons come back without a link
+
+Exits non-zero if any check fails. Takes a few seconds: the Meet polling
+waits a second between rounds, as it does in production.
+
+Usage:
+    python scripts/check_calendar_events.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_calendar import FakeCalendarServer
+
+CALENDAR = 'tutor@example.com'
+
+
+def lesson(day, event_id):
+    return {'date': f"2027-03-{day:02d}", 'start_time': '15:00', 'end_time': '16:00', 'event_id': event_id}
+
+
+def main():
+    server = FakeCalendarServer().start()
+    os.environ['GOOGLE_CALENDAR_EMULATOR_HOST'] = server.host
+    os.environ['GOOGLE_CALENDAR_ID'] = CALENDAR
+    import calendar_service
+
+    failures = []
+
+    def check(condition, message):
+        print(f"  {'ok' if condition else 'FAIL'}: {message}")
+        if not condition:
+            failures.append(message)
+
+    print("Existing event and a rejected lesson in one batch")
+    existing, rejected, fresh = (calendar_service.event_id_for(f"check-{n}") for n in range(3))
+    # As if an earlier attempt had created this one before failing.
+    earlier = {**calendar_service._lesson_event(lesson(1, existing), 'student@example.com', 'Student'),
+               'summary': 'earlier attempt'}
+    server.call('POST', f"/calendar/v3/calendars/{CALENDAR}/events", json.dumps(earlier).encode())
+    server.reject_ids = {rejected}
+    server.reset_counters()
+    results = calendar_service.create_lesson_events(
+        [lesson(1, existing), lesson(2, rejected), lesson(3, fresh)], 'student@example.com', 'Student')
+    check(isinstance(results[0], dict) and results[0]['event_id'] == existing,
+          "409 on insert falls back to fetching the existing event")
+    check(server.events[CALENDAR][existing]['event']['summary'] == 'earlier attempt',
+          "the existing event is not overwritten")
+    check(isinstance(results[1], Exception), "the rejected lesson comes back as its exception")
+    check(isinstance(results[2], dict) and results[2]['meet_link'],
+          "the other lesson in the batch still gets its event and Meet link")
+    check(server.round_trips == 2, f"one insert batch and one fetch batch (got {server.round_trips} round trips)")
+
+    print("Meet links that never appear")
+    server.reject_ids = set()
+    server.meet_after = 10 ** 6
+    server.reset_counters()
+    ids = [calendar_service.event_id_for(f"check-poll-{n}") for n in range(2)]
+    results = calendar_service.create_lesson_events(
+        [lesson(10 + n, event_id) for n, event_id in enumerate(ids)], 'student@example.com', 'Student')
+    check(all(isinstance(r, dict) and r['event_id'] and r['meet_link'] is None for r in results),
+          "lessons come back with their event and no Meet link")
+    rounds = calendar_service.MEET_POLL_ATTEMPTS
+    check(server.round_trips == 1 + rounds,
+          f"polling stops after {rounds} re-fetch rounds (got {server.round_trips - 1})")
+    check(all(server.events[CALENDAR][event_id]['gets'] == rounds for event_id in ids),
+          "each event is re-fetched once per round")
+
+    server.stop()
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed")
+    print("All checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Local stand-in for the Google Calendar v3 API, for benchmarks and manual
+testing of the calendar code without a Workspace account.
+
+Serves, over plain HTTP on 127.0.0.1:
+- events insert, get and delete
+  (/calendar/v3/calendars/{calendar}/events[/{id}])
+- the multipart batch endpoint (/batch/calendar/v3) that googleapiclient's
+  BatchHttpRequest posts to
+
+Inserting an event with an id that already exists returns 409, like the
+real API, and inserting one whose id is in `reject_ids` returns 400, to
+make a single request in a batch fail. Conference data is "pending" until an event has been fetched
+`meet_after` times (0: the Meet link comes back from the insert), which
+simulates Meet provisioning lag. `latency` seconds are slept per HTTP round
+trip. `round_trips` counts HTTP requests and `calls` counts API operations
+(a batch is one round trip carrying several calls).
+
+Point the app at it with GOOGLE_CALENDAR_EMULATOR_HOST=127.0.0.1:<port>:
+
+    server = FakeCalendarServer(latency=0.05).start()
+    os.environ['GOOGLE_CALENDAR_EMULATOR_HOST'] = server.host
+"""
+
+import email.parser
+import email.policy
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+_EVENTS = re.compile(r'^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$')
+_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict'}
+
+
+class FakeCalendarServer:
+    def __init__(self, latency=0.0, meet_after=0):
+        self.latency = latency
+        self.meet_after = meet_after
+        self.reject_ids = set()
+        self.events = {}
+        self.round_trips = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, payload = fake.handle_http(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _handle
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counters(self):
+        self.round_trips = self.calls = 0
+
+    # ── HTTP ──
+
+    def handle_http(self, method, path, headers, body):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if urlsplit(path).path == '/batch/calendar/v3':
+            return self._batch(headers['Content-Type'], body)
+        status, result = self.call(method, path, body)
+        return status, {'Content-Type': 'application/json'}, json.dumps(result).encode()
+
+    def _batch(self, content_type, body):
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        boundary = uuid.uuid4().hex
+        out = []
+        for part in message.iter_parts():
+            raw = part.get_payload(decode=True).decode()
+            head, _, inner_body = raw.partition('\r\n\r\n') if '\r\n\r\n' in raw else raw.partition('\n\n')
+            method, target, _ = head.splitlines()[0].split(' ', 2)
+            status, result = self.call(method, target, inner_body.encode())
+            content_id = part['Content-ID'].strip('<>')
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(result)}\r\n"
+            )
+        payload = (''.join(out) + f"--{boundary}--\r\n").encode()
+        return 200, {'Content-Type': f'multipart/mixed; boundary={boundary}'}, payload
+
+    # ── API ──
+
+    def call(self, method, target, body=b''):
+        """One Calendar API operation: (status, JSON-able result)."""
+        with self._lock:
+            self.calls += 1
+            match = _EVENTS.match(urlsplit(target).path)
+            if not match:
+                return 404, _error(404, 'Not Found')
+            calendar_id, event_id = unquote(match.group(1)), match.group(2)
+            events = self.events.setdefault(calendar_id, {})
+
+            if method == 'POST' and event_id is None:
+                event = json.loads(body or b'{}')
+                event_id = event.get('id') or uuid.uuid4().hex
+                if event_id in self.reject_ids:
+                    return 400, _error(400, 'Invalid event.')
+                if event_id in events:
+                    return 409, _error(409, 'The requested identifier already exists.')
+                event.update(id=event_id, status='confirmed', htmlLink=f'https://calendar.test/event?eid={event_id}')
+                events[event_id] = {'event': event, 'gets': 0}
+                return 200, self._view(events[event_id])
+
+            if event_id not in events:
+                return 404, _error(404, 'Not Found')
+            if method == 'GET':
+                events[event_id]['gets'] += 1
+                return 200, self._view(events[event_id])
+            if method == 'DELETE':
+                del events[event_id]
+                return 204, {}
+            return 405, _error(405, 'Method Not Allowed')
+
+    def _view(self, stored):
+        event = dict(stored['event'])
+        request = (event.get('conferenceData') or {}).get('createRequest')
+        if request:
+            conference = {'createRequest': {**request, 'status': {'statusCode': 'pending'}}}
+            if stored['gets'] >= self.meet_after:
+                code = request['requestId'][:10]
+                conference = {
+                    'createRequest': {**request, 'status': {'statusCode': 'success'}},
+                    'entryPoints': [{'entryPointType': 'video', 'uri': f'https://meet.test/{code}'}],
+                }
+            event['conferenceData'] = conference
+        return event
+
+
+def _error(code, message):
+    return {'error': {'code': code, 'message': message, 'errors': [{'message': message}]}}
@@ -0,0 +1,320 @@
+"""
+Minimal in-memory stand-in for the Firestore client, for the benchmarks.
+
+Supports the calls BookingService makes: collection/document get/set/update/
+delete, where(filter=FieldFilter(...)) with ==, !=, <, <=, >, >= and in,
+order_by, limit, start_after, select, stream, get_all and batch(). It also handles the SERVER_TIMESTAMP,
+DELETE_FIELD and Increment transforms, and transactions that work with
+@firestore.transactional. Transaction writes are buffered until commit.
+Commits are optimistic: if any document the transaction read has been
+written since, the commit raises Aborted and @firestore.transactional
+retries, the way contended transactions behave in Firestore. Queries in a
+transaction only track the documents they returned (no phantom
+detection). `aborts` counts those retries, and `conflicts` counts them by
+the collection of the document that changed.
+
+It counts document reads the way Firestore bills them: one per document
+returned, and at least one per query. It also counts round trips (`rpcs`).
+Pass latency=seconds to make every round trip sleep that long, so
+sequential and batched access patterns show up in timings.
+"""
+
+import copy
+import itertools
+import operator
+import threading
+import time
+from datetime import datetime, timezone
+
+from google.api_core.exceptions import Aborted
+from google.cloud.firestore_v1 import DELETE_FIELD, SERVER_TIMESTAMP
+from google.cloud.firestore_v1.transforms import Increment
+
+_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+}
+
+
+def _apply_transforms(current, fields):
+    out = dict(current or {})
+    for field, value in fields.items():
+        if value is DELETE_FIELD:
+            out.pop(field, None)
+            continue
+        if value is SERVER_TIMESTAMP:
+            value = datetime.now(timezone.utc)
+        elif isinstance(value, Increment):
+            value = out.get(field, 0) + value.value
+        else:
+            value = copy.deepcopy(value)
+        out[field] = value
+    return out
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, reference=None):
+        self.id = doc_id
+        self._data = data
+        self.reference = reference
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self._db = db
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._collection}/{self.id}"
+
+    def _read(self):
+        self._db.count(reads=1)
+        with self._db._lock:
+            snap = FakeSnapshot(self.id, self._db.data.get(self._collection, {}).get(self.id), self)
+            snap.version = self._db.versions.get(self.path, 0)
+        return snap
+
+    def _set(self, data):
+        self._db.count(writes=1)
+        with self._db._lock:
+            self._db.data.setdefault(self._collection, {})[self.id] = _apply_transforms(None, data)
+            self._db.bump(self.path)
+
+    def _update(self, fields):
+        self._db.count(writes=1)
+        with self._db._lock:
+            docs = self._db.data[self._collection]
+            docs[self.id] = _apply_transforms(docs[self.id], fields)
+            self._db.bump(self.path)
+
+    def _delete(self, _=None):
+        self._db.count(writes=1)
+        with self._db._lock:
+            self._db.data.get(self._collection, {}).pop(self.id, None)
+            self._db.bump(self.path)
+
+    def get(self, transaction=None):
+        self._db.round_trip()
+        snap = self._read()
+        if transaction is not None:
+            transaction._seen(snap)
+        return snap
+
+    def set(self, data):
+        self._db.round_trip()
+        self._set(data)
+
+    def update(self, fields):
+        self._db.round_trip()
+        self._update(fields)
+
+    def delete(self):
+        self._db.round_trip()
+        self._delete()
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=(), order=(), limit=None, fields=None, after=None):
+        self._db = db
+        self._collection = collection
+        self._filters = list(filters)
+        self._order = list(order)
+        self._limit = limit
+        self._fields = fields
+        self._after = after
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, order=self._order, limit=self._limit, fields=self._fields,
+                     after=self._after)
+        state.update(changes)
+        return FakeQuery(self._db, self._collection, **state)
+
+    def where(self, filter):
+        return self._copy(filters=self._filters + [(filter.field_path, filter.op_string, filter.value)])
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(order=self._order + [(field, direction == 'DESCENDING')])
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, values):
+        """Cursor from a dict of the order_by fields' values (ascending orders only)."""
+        return self._copy(after=dict(values))
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def stream(self, transaction=None):
+        self._db.round_trip()
+        rows = []
+        with self._db._lock:
+            docs = list(self._db.data.get(self._collection, {}).items())
+        for doc_id, data in docs:
+            if all(field in data and _OPS[op](data[field], value) for field, op, value in self._filters):
+                rows.append((doc_id, data))
+        for field, descending in reversed(self._order):
+            rows.sort(key=lambda row: row[1].get(field), reverse=descending)
+        if self._after is not None:
+            fields = [field for field, _ in self._order]
+            cursor = tuple(self._after[field] for field in fields)
+            rows = [row for row in rows if tuple(row[1].get(field) for field in fields) > cursor]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        self._db.count(reads=max(1, len(rows)))
+        for doc_id, data in rows:
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            snap = FakeSnapshot(doc_id, data, FakeDocument(self._db, self._collection, doc_id))
+            if transaction is not None:
+                snap.version = self._db.versions.get(snap.reference.path, 0)
+                transaction._seen(snap)
+            yield snap
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+
+    def document(self, doc_id):
+        return FakeDocument(self._db, self._collection, doc_id)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, ref, data):
+        self._writes.append(('_set', ref, data))
+
+    def update(self, ref, fields):
+        self._writes.append(('_update', ref, fields))
+
+    def delete(self, ref):
+        self._writes.append(('_delete', ref, None))
+
+    def commit(self):
+        self._db.round_trip()
+        for method, ref, data in self._writes:
+            getattr(ref, method)(data)
+        self._writes = []
+        return []
+
+
+class FakeTransaction(FakeBatch):
+    _ids = itertools.count(1)
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._max_attempts = 5
+        self._read_only = False
+        self._id = None
+        self._read_versions = {}
+
+    @property
+    def in_progress(self):
+        return self._id is not None
+
+    def _begin(self, retry_id=None):
+        self._id = next(self._ids)
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+        self._read_versions = {}
+
+    def _seen(self, snap):
+        self._read_versions.setdefault(snap.reference.path, snap.version)
+
+    def _commit(self):
+        if self._writes:
+            self._db.round_trip()
+            with self._db._commit_lock:
+                for path, version in self._read_versions.items():
+                    if self._db.versions.get(path, 0) != version:
+                        with self._db._lock:
+                            self._db.aborts += 1
+                            collection = path.split("/")[0]
+                            self._db.conflicts[collection] = self._db.conflicts.get(collection, 0) + 1
+                        self._clean_up()
+                        raise Aborted(f"Transaction lock timeout: {path} changed")
+                for method, ref, data in self._writes:
+                    getattr(ref, method)(data)
+        self._clean_up()
+        return []
+
+    def _rollback(self):
+        self._clean_up()
+
+    def get(self, ref):
+        return iter([ref.get(transaction=self)])
+
+    def get_all(self, refs):
+        snaps = self._db.get_all(refs)
+        for snap in snaps:
+            self._seen(snap)
+        return iter(snaps)
+
+
+class FakeFirestore:
+    def __init__(self, latency=0.0):
+        self.data = {}
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self.rpcs = 0
+        self.aborts = 0
+        self.conflicts = {}
+        self.versions = {}
+        self._lock = threading.RLock()
+        self._commit_lock = threading.Lock()
+
+    def count(self, reads=0, writes=0):
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+
+    def round_trip(self):
+        with self._lock:
+            self.rpcs += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def bump(self, path):
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def reset_counters(self):
+        self.reads = self.writes = self.rpcs = self.aborts = 0
+        self.conflicts = {}
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, refs, transaction=None):
+        self.round_trip()
+        snaps = [ref._read() for ref in refs]
+        if transaction is not None:
+            for snap in snaps:
+                transaction._seen(snap)
+        return snaps
@@ -0,0 +1,140 @@
+"""
+Pre-generate the photo renditions the site requests and upload them to Storage.
+
+Walks every images/{id}/ original and writes renditions/{id}/w{width}-q{quality}.{ext}
+for each entry in PREBUILT_RENDITIONS, in each of PREBUILT_FORMATS. Each upload
+records the original's generation in its metadata; renditions whose source
+generation is unchanged are skipped, so re-running only processes new or
+replaced photos. The /api/images manifest details (dimensions, dominant
+colour, blur placeholder) are filled in for the same photos.
+
+The work runs across a process pool. Each worker downloads its own original
+(by blob name and generation) and builds the renditions and description
+from a single decode. At most twice as many photos as there are workers
+are in flight at once, so memory stays flat however large the library is.
+
+After a run, POST /api/images/refresh (or wait for the index TTL) so the
+running app picks the new renditions up.
+
+Usage:
+    python scripts/generate_renditions.py [--workers N] [--force]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from firebase_config import initialize_firebase
+from image_index import ImageIndex
+from image_processing import (
+    PREBUILT_RENDITIONS, PREBUILT_FORMATS, supported_formats, rendition_blob_name, render_many, mimetype_for,
+    render_and_describe,
+)
+
+
+RENDITION_SPECS = [
+    (width, quality, fmt)
+    for fmt in PREBUILT_FORMATS if fmt in supported_formats()
+    for width, quality in PREBUILT_RENDITIONS
+]
+
+
+def plan_jobs(index, force=False):
+    """Returns [(entry, [(width, quality, fmt), ...], needs_description)] for photos with work to do."""
+    jobs = []
+    for entry in index.all():
+        missing = [
+            spec for spec in RENDITION_SPECS
+            if force or not index.prebuilt(entry, *spec)
+        ]
+        needs_description = force or not entry.get('description')
+        if missing or needs_description:
+            jobs.append((entry, missing, needs_description))
+    return jobs
+
+
+# ── Worker processes ──
+
+_worker_bucket = None
+
+
+def _init_worker():
+    global _worker_bucket
+    _worker_bucket = initialize_firebase()
+
+
+def process_photo(blob_name, generation, specs, needs_description):
+    """Download one original and build its renditions (and description, if
+    needed) from one decode. Returns (renditions, description or None)."""
+    original = _worker_bucket.blob(blob_name, generation=generation).download_as_bytes()
+    if needs_description:
+        return render_and_describe(original, specs)
+    return render_many(original, specs), None
+
+
+def upload(bucket, entry, specs, renditions):
+    for (width, quality, fmt), data in zip(specs, renditions):
+        blob = bucket.blob(rendition_blob_name(entry['id'], width, quality, fmt))
+        blob.metadata = {'source_generation': str(entry['generation'])}
+        blob.cache_control = 'public, max-age=31536000'
+        blob.upload_from_string(data, content_type=mimetype_for(fmt))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Pillow worker processes')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the source is unchanged')
+    args = parser.parse_args()
+
+    bucket = initialize_firebase()
+    if not bucket:
+        sys.exit("Firebase Storage not initialized")
+
+    index = ImageIndex(lambda: bucket)
+    index.refresh()
+    jobs = plan_jobs(index, force=args.force)
+    skipped = len(index.all()) * len(RENDITION_SPECS) - sum(len(specs) for _, specs, _ in jobs)
+    print(f"{len(jobs)} photos to process, {skipped} renditions already up to date")
+
+    built = described = failed = 0
+    max_in_flight = 2 * args.workers
+    # spawn: each worker opens its own Storage client rather than a forked copy
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=_init_worker) as pool:
+        queue = iter(jobs)
+        in_flight = {}
+        while True:
+            for entry, specs, needs_description in islice(queue, max_in_flight - len(in_flight)):
+                future = pool.submit(process_photo, entry['blob_name'], entry['generation'], specs, needs_description)
+                in_flight[future] = (entry, specs)
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry, specs = in_flight.pop(future)
+                try:
+                    renditions, description = future.result()
+                    done_parts = []
+                    if specs:
+                        upload(bucket, entry, specs, renditions)
+                        built += len(specs)
+                        done_parts.append(', '.join(f'w{w}-q{q}.{fmt}' for w, q, fmt in specs))
+                    if description:
+                        index.store_description(entry, description)
+                        described += 1
+                        done_parts.append('described')
+                    print(f"  images/{entry['id']}: {'; '.join(done_parts)}")
+                except Exception as e:
+                    failed += 1
+                    print(f"  images/{entry['id']}: failed: {e}")
+
+    print(f"Done! Built {built} renditions, described {described} photos, {failed} photos failed.")
+
+
+if __name__ == "__main__":
+    main()
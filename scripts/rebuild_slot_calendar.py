@@ -0,0 +1,96 @@
+"""
+Rebuild the materialised slot calendar (slot_calendar/{YYYY-MM}) from
+availability and bookings.
+
+The booking code keeps these documents current by applying deltas, so this
+is only for recovery: after editing availability or bookings by hand in the
+console, after a failed write, or to pre-build months ahead of time.
+
+Usage:
+    python scripts/rebuild_slot_calendar.py                  # every stored month from this one on
+    python scripts/rebuild_slot_calendar.py --all            # every stored month, past ones too
+    python scripts/rebuild_slot_calendar.py --month 2026-06  # one month (built if missing)
+    python scripts/rebuild_slot_calendar.py --ahead 6        # also build the next 6 months
+    python scripts/rebuild_slot_calendar.py --check          # report drift without writing
+    python scripts/rebuild_slot_calendar.py --prune          # delete stored months past the window
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services import services
+from slot_calendar import MONTHS_AHEAD, in_stored_window, month_key
+
+
+def parse_month(value):
+    try:
+        parsed = datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+    return parsed.year, parsed.month
+
+
+def months_from(year, month, count):
+    for _ in range(count):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--month', type=parse_month, action='append', help='month to rebuild (YYYY-MM); repeatable')
+    parser.add_argument('--all', action='store_true', help='include stored months before the current one')
+    parser.add_argument('--ahead', type=int, default=0, help='also build this many months from the current one')
+    parser.add_argument('--check', action='store_true', help='compare stored documents with a rebuild, write nothing')
+    parser.add_argument('--prune', action='store_true',
+                        help=f'delete stored months more than {MONTHS_AHEAD} months ahead, then exit')
+    args = parser.parse_args()
+
+    svc = services.booking()
+    now = datetime.utcnow()
+
+    if args.prune:
+        current = month_key(now.year, now.month)
+        beyond = [key for key in svc.calendar_months(from_key=current)
+                  if not in_stored_window(*parse_month(key), now.date())]
+        for key in beyond:
+            svc.db.collection("slot_calendar").document(key).delete()
+            print(f"  deleted {key}")
+        print(f"Done! Pruned {len(beyond)} months.")
+        return
+
+    if args.month:
+        targets = set(args.month)
+    else:
+        stored = svc.calendar_months(from_key=None if args.all else month_key(now.year, now.month))
+        targets = {parse_month(key) for key in stored}
+    targets.update(months_from(now.year, now.month, args.ahead))
+
+    drifted = 0
+    for year, month in sorted(targets):
+        key = month_key(year, month)
+        if args.check:
+            snap = svc._calendar_ref(year, month).get()
+            expected = svc._build_months([(year, month)])[(year, month)]
+            stored = snap.to_dict() if snap.exists else None
+            same = stored is not None and all(stored.get(f) == expected[f] for f in ('slots', 'booked'))
+            drifted += not same
+            print(f"  {key}: {'ok' if same else 'missing' if stored is None else 'DRIFTED'}")
+            continue
+        doc = svc.rebuild_month(year, month)
+        print(f"  {key}: {len(doc['slots'])} free slots, {len(doc['booked'])} booked")
+
+    if args.check:
+        if drifted:
+            sys.exit(f"{drifted} of {len(targets)} months need a rebuild")
+        print(f"All {len(targets)} months up to date.")
+    else:
+        print(f"Done! Rebuilt {len(targets)} months.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Run due background jobs (jobs/{id}) once and exit.
+
+The web process runs jobs on its own worker threads and sweeps for due
+ones every JOB_POLL_SECONDS. On Vercel an external scheduler calls
+/tutoring/admin/run-jobs to do the sweep instead; this script is the
+same sweep from a shell, e.g. to drain a backlog by hand.
+
+Usage:
+    python scripts/run_jobs.py              # run every due job
+    python scripts/run_jobs.py --list       # show due jobs, run nothing
+    python scripts/run_jobs.py --retry-failed  # give failed jobs another go
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from google.cloud.firestore_v1 import FieldFilter
+
+from job_queue import COLLECTION
+from services import services
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--list', action='store_true', help='list due jobs without running them')
+    parser.add_argument('--retry-failed', action='store_true', help='reset failed jobs to pending first')
+    args = parser.parse_args()
+
+    queue = services.booking().jobs
+
+    if args.retry_failed:
+        failed = queue.db.collection(COLLECTION).where(filter=FieldFilter("status", "==", "failed")).stream()
+        for doc in failed:
+            doc.reference.update({"status": "pending", "attempts": 0, "run_at": doc.to_dict()["created_at"]})
+            print(f"  reset {doc.id}")
+
+    if args.list:
+        due = queue.due_jobs(limit=500)
+        for job_id in due:
+            print(f"  {job_id}")
+        print(f"{len(due)} jobs due.")
+        return
+
+    results = queue.run_due(limit=500)
+    total = sum(results.values())
+    print(f"Done! Ran {total} jobs: " + (", ".join(f"{n} {s}" for s, n in results.items()) or "none due"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold-start report: import-time breakdown and first-request latency.
+
+Imports the app in a fresh interpreter under `python -X importtime` and
+totals the cumulative import time per top-level package. It then times the
+first request to a few routes, each in its own fresh interpreter, and lists
+which of the deferred heavy modules (main.DEFERRED_MODULES) that request
+pulled in. Firebase is not configured here unless the environment provides
+it, so Storage-backed routes measure the "not initialised" path.
+
+Usage:
+    python scripts/startup_report.py [--top N] [--budget-ms MS] [path ...]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DEFAULT_PATHS = ['/content/static/css/index.css', '/', '/photos', '/api/images', '/tutoring/book']
+
+FIRST_REQUEST = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.app.test_client().get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'request_ms': (done - imported) * 1000,
+    'loaded': [m for m in main.DEFERRED_MODULES if m in sys.modules],
+}))
+"""
+
+
+def run_python(args):
+    return subprocess.run([sys.executable, *args], cwd=SRC_DIR, capture_output=True, text=True)
+
+
+def import_breakdown():
+    """(total ms, {package: cumulative ms}) for the modules `import main` loads."""
+    result = run_python(['-X', 'importtime', '-c', 'import main'])
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # importtime lists a module's imports (indented two spaces per
+        # level) before the module itself.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(cumulative) / 1000
+        if depth == 1:
+            package = name.strip().split('.')[0]
+            children[package] = children.get(package, 0) + ms
+        elif depth == 0:
+            if name.strip() == 'main':
+                return ms, children
+            children = {}
+    raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+
+
+def first_request(path):
+    result = run_python(['-c', FIRST_REQUEST, path])
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'no output')
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS, help='routes to time a first request against')
+    parser.add_argument('--top', type=int, default=12, help='packages to list in the import breakdown')
+    parser.add_argument('--budget-ms', type=float, help='exit 1 if importing the app takes longer than this')
+    args = parser.parse_args()
+
+    app_ms, totals = import_breakdown()
+    print(f"Importing the app: {app_ms:.1f} ms")
+    for package, ms in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<28}{ms:>8.1f} ms")
+
+    print("\nFirst request in a fresh process:")
+    for path in args.paths:
+        try:
+            r = first_request(path)
+        except RuntimeError as e:
+            print(f"  {path:<32} failed: {e}")
+            continue
+        loaded = ', '.join(r['loaded']) or 'none'
+        print(f"  {path:<32}{r['request_ms']:>8.1f} ms  (+{r['import_ms']:.0f} ms import)  loaded: {loaded}")
+
+    if args.budget_ms is not None and app_ms > args.budget_ms:
+        sys.exit(f"App import took {app_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Fingerprinted, pre-minified JS/CSS produced by scripts/build_assets.py.
+
+The build writes static/dist/{js,css}/<name>.<hash>.<ext> (with precompressed
+.gz/.br siblings) plus a manifest mapping each source path (e.g.
+"js/index.js") to its built file. Templates link assets through asset_url(),
+and serve_js/serve_css answer from the built bytes without minifying,
+compressing or stat-ing anything per request. When no
+manifest is present (local dev before a build), everything falls back to
+the plain static files.
+"""
+import json
+import os
+from flask import url_for
+
+try:
+    from src.compression import EXTENSIONS
+except ImportError:
+    from compression import EXTENSIONS
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+_ENDPOINTS = {'js': 'serve_js', 'css': 'serve_css'}
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+MANIFEST = _load_manifest()
+_SOURCES = {built: source for source, built in MANIFEST.items()}
+_contents = {}
+
+
+def fingerprint_of(built_path):
+    """The content hash embedded in a built file name: js/index.<hash>.js."""
+    return built_path.rsplit('.', 2)[1]
+
+
+def asset_url(path):
+    """URL for a static JS/CSS source path, fingerprinted when a build exists."""
+    built = MANIFEST.get(path)
+    if not built:
+        return url_for('static', filename=path)
+    kind, filename = built.split('/', 1)
+    return url_for(_ENDPOINTS[kind], filename=filename)
+
+
+def _load_variants(built):
+    """{'identity': bytes, 'gzip': bytes, 'br': bytes} for whichever files the build wrote."""
+    path = os.path.join(DIST_DIR, built)
+    with open(path, 'rb') as f:
+        variants = {'identity': f.read()}
+    for encoding, ext in EXTENSIONS.items():
+        try:
+            with open(path + ext, 'rb') as f:
+                variants[encoding] = f.read()
+        except OSError:
+            pass
+    return variants
+
+
+def get_built(kind, filename):
+    """Returns (variants, fingerprint, immutable) for a built asset, else None.
+
+    A fingerprinted name is immutable. The plain source name is also served
+    from the build (current version), just without the immutable promise.
+    """
+    requested = f"{kind}/{filename}"
+    if requested in _SOURCES:
+        built, immutable = requested, True
+    elif requested in MANIFEST:
+        built, immutable = MANIFEST[requested], False
+    else:
+        return None
+    variants = _contents.get(built)
+    if variants is None:
+        variants = _contents[built] = _load_variants(built)
+    return variants, fingerprint_of(built), immutable
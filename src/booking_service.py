@@ -1,26 +1,37 @@
+import os
 import uuid
-import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
 from google.cloud.firestore_v1 import FieldFilter
 from firebase_admin import firestore
 import stripe
 
 try:
     from src.firebase_config import get_db
-    from src.calendar_service import create_lesson_event
+    from src.calendar_service import create_lesson_events, event_id_for
+    from src.job_queue import JobQueue
+    from src import slot_calendar
 except ImportError:
     from firebase_config import get_db
-    from calendar_service import create_lesson_event
+    from calendar_service import create_lesson_events, event_id_for
+    from job_queue import JobQueue
+    import slot_calendar
+
+CALENDAR_JOB = "calendar_event"
+SLOT_SYNC_JOB = "slot_calendar_sync"
 
 
 class BookingService:
-    def __init__(self):
-        self.db = get_db()
+    # Shared across requests through services.booking(); keep per-request
+    # state out of the instance.
+    def __init__(self, db=None, jobs=None):
+        self.db = db or get_db()
+        self.jobs = jobs or JobQueue(self.db)
+        self.jobs.register(CALENDAR_JOB, self.provision_calendar_events, on_failure=self._calendar_job_failed)
+        self.jobs.register(SLOT_SYNC_JOB, self._slot_sync_job)
 
     # ── Packages (from Stripe) ──
 
     def get_packages(self):
-        import os
         pid = os.getenv("STRIPE_PRODUCT_ID")
         if not pid:
             return []
@@ -53,11 +64,11 @@ class BookingService:
         items.sort(key=lambda a: (a.get("day_of_week", 0), a.get("start_time", "")))
         return items
 
-    def get_active_availability(self):
+    def get_active_availability(self, transaction=None):
         docs = (
             self.db.collection("availability")
             .where(filter=FieldFilter("active", "==", True))
-            .stream()
+            .stream(transaction=transaction)
         )
         items = [doc.to_dict() for doc in docs]
         items.sort(key=lambda a: (a.get("day_of_week", 0), a.get("start_time", "")))
@@ -75,101 +86,148 @@ class BookingService:
             "created_at": firestore.SERVER_TIMESTAMP,
         }
         self.db.collection("availability").document(avail_id).set(avail)
+        for ref in self._open_calendar_months():
+            self._apply_to_month(ref, lambda doc: slot_calendar.add_window(doc, avail))
         return avail
 
     def delete_availability(self, avail_id):
         self.db.collection("availability").document(avail_id).delete()
+        for ref in self._open_calendar_months():
+            self._apply_to_month(ref, lambda doc: slot_calendar.remove_window(doc, avail_id))
 
-    # ── Generate available slots for a month from availability patterns ──
+    # ── Materialised slot calendar (see slot_calendar.py) ──
 
     def get_available_for_month(self, year, month):
-        """Returns list of {date, start_time, end_time, duration_minutes, day_of_week}
-        for days that have availability and are NOT fully booked."""
-        availability = self.get_active_availability()
-        if not availability:
-            return []
-
-        # Build a map: day_of_week -> list of time windows
-        by_dow = {}
-        for a in availability:
-            dow = a["day_of_week"]
-            if dow not in by_dow:
-                by_dow[dow] = []
-            by_dow[dow].append(a)
-
-        # Generate all possible dates in the month
-        first = datetime(year, month, 1)
-        if month == 12:
-            last = datetime(year + 1, 1, 1)
-        else:
-            last = datetime(year, month + 1, 1)
-
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-        slots = []
-        current = first
-        while current < last:
-            if current >= today:
-                dow = current.weekday()
-                if dow in by_dow:
-                    date_str = current.strftime("%Y-%m-%d")
-                    for window in by_dow[dow]:
-                        # Split window into individual lesson slots
-                        for s_time, e_time in self._split_window(
-                            window["start_time"], window["end_time"], window["duration_minutes"]
-                        ):
-                            slots.append({
-                                "date": date_str,
-                                "start_time": s_time,
-                                "end_time": e_time,
-                                "duration_minutes": window["duration_minutes"],
-                                "day_of_week": dow,
-                                "availability_id": window["id"],
-                            })
-            current += timedelta(days=1)
-
-        # Remove already-booked slots
-        booked = self._get_booked_dates_for_month(year, month)
-        slots = [s for s in slots if (s["date"], s["start_time"]) not in booked]
-
-        return slots
+        """Returns list of {date, start_time, end_time, duration_minutes, day_of_week,
+        availability_id} for the month's free slots from today on: one document read."""
+        doc = self._month_calendars([(year, month)])[(year, month)]
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        return slot_calendar.free_slots(doc, from_date=today)
 
-    @staticmethod
-    def _split_window(start_time, end_time, duration_minutes):
-        """Split a time window into individual lesson slots.
-        e.g., 15:00-18:00 with 60min -> [(15:00,16:00), (16:00,17:00), (17:00,18:00)]
-        """
-        sh, sm = map(int, start_time.split(':'))
-        eh, em = map(int, end_time.split(':'))
-        start_min = sh * 60 + sm
-        end_min = eh * 60 + em
+    def get_available_range(self, start_date, end_date):
+        """Free slots between two YYYY-MM-DD dates (inclusive, from today on),
+        from one batched read of the months they span."""
+        start_date = max(start_date, datetime.utcnow().strftime("%Y-%m-%d"))
+        if start_date > end_date:
+            return []
+        docs = self._month_calendars(slot_calendar.months_between(start_date, end_date))
         slots = []
-        while start_min + duration_minutes <= end_min:
-            s = f"{start_min // 60:02d}:{start_min % 60:02d}"
-            e_min = start_min + duration_minutes
-            e = f"{e_min // 60:02d}:{e_min % 60:02d}"
-            slots.append((s, e))
-            start_min = e_min
+        for ym in sorted(docs):
+            slots.extend(slot_calendar.free_slots(docs[ym], from_date=start_date, to_date=end_date))
         return slots
 
-    def _get_booked_dates_for_month(self, year, month):
-        """Returns set of (date, start_time) that are booked."""
-        start = f"{year}-{month:02d}-01"
-        if month == 12:
-            end = f"{year + 1}-01-01"
-        else:
-            end = f"{year}-{month + 1:02d}-01"
+    def _calendar_ref(self, year, month):
+        return self.db.collection(slot_calendar.COLLECTION).document(slot_calendar.month_key(year, month))
+
+    def _month_calendars(self, months):
+        """{(year, month): calendar document}, building any that are missing.
+        Missing months inside the stored window are stored; others are
+        built in memory only (see slot_calendar.in_stored_window)."""
+        refs = {slot_calendar.month_key(*ym): ym for ym in months}
+        docs = {}
+        for snap in self.db.get_all([self._calendar_ref(*ym) for ym in months]):
+            if snap.exists:
+                docs[refs[snap.id]] = snap.to_dict()
+        today = datetime.utcnow().date()
+        missing = [ym for ym in months if ym not in docs and slot_calendar.in_stored_window(*ym, today)]
+        transient = sorted(ym for ym in months if ym not in docs and ym not in missing)
+        docs.update(self._build_months(transient))
+        if not missing:
+            return docs
+
+        # Built inside a transaction that also reads the bookings, so a booking
+        # committed while we build forces a retry instead of being missed.
+        @firestore.transactional
+        def _build(transaction):
+            built = {}
+            for snap in transaction.get_all([self._calendar_ref(*ym) for ym in missing]):
+                if snap.exists:
+                    built[refs[snap.id]] = snap.to_dict()
+            todo = [ym for ym in missing if ym not in built]
+            for ym, doc in self._build_months(todo, transaction=transaction).items():
+                transaction.set(self._calendar_ref(*ym), {**doc, "updated_at": firestore.SERVER_TIMESTAMP})
+                built[ym] = doc
+            return built
+
+        docs.update(_build(self.db.transaction()))
+        return docs
+
+    def _build_months(self, months, transaction=None):
+        """Fresh calendar documents for `months` (sorted (year, month) pairs):
+        availability is read and split once, bookings in one range query."""
+        if not months:
+            return {}
+        availability = [
+            doc.to_dict() for doc in
+            self.db.collection("availability")
+            .where(filter=FieldFilter("active", "==", True))
+            .stream(transaction=transaction)
+        ]
+        by_dow = slot_calendar.split_availability(availability)
+        start = slot_calendar.month_bounds(*months[0])[0]
+        end = slot_calendar.month_bounds(*months[-1])[1]
+        booked_by_month = {}
+        for d, t in self._get_booked_slots(start, end, transaction=transaction):
+            booked_by_month.setdefault((int(d[:4]), int(d[5:7])), []).append((d, t))
+        return {
+            (year, month): slot_calendar.build_month(by_dow, booked_by_month.get((year, month), []), year, month)
+            for year, month in months
+        }
 
+    def rebuild_month(self, year, month):
+        """Recompute a month's calendar document from availability and bookings."""
+        doc = self._build_months([(year, month)])[(year, month)]
+        self._calendar_ref(year, month).set({**doc, "updated_at": firestore.SERVER_TIMESTAMP})
+        return doc
+
+    def calendar_months(self, from_key=None):
+        """Keys (YYYY-MM) of the materialised months, optionally from one on."""
+        query = self.db.collection(slot_calendar.COLLECTION)
+        if from_key:
+            query = query.where(filter=FieldFilter("key", ">=", from_key))
+        return sorted(doc.id for doc in query.select(["key"]).stream())
+
+    def _open_calendar_months(self):
+        """Refs of the materialised months from the current one on; past months
+        are never shown, so availability changes leave them alone."""
+        now = datetime.utcnow()
+        current = slot_calendar.month_key(now.year, now.month)
+        return [
+            self.db.collection(slot_calendar.COLLECTION).document(key)
+            for key in self.calendar_months(from_key=current)
+        ]
+
+    def _apply_to_month(self, ref, mutate):
+        """Read-modify-write one month document; months not built yet are skipped
+        (they are built from the source data on first read)."""
+        @firestore.transactional
+        def _apply(transaction):
+            snap = ref.get(transaction=transaction)
+            if not snap.exists:
+                return
+            doc = snap.to_dict()
+            mutate(doc)
+            transaction.set(ref, {**doc, "updated_at": firestore.SERVER_TIMESTAMP})
+
+        _apply(self.db.transaction())
+
+    def _get_booked_slots(self, start, end, transaction=None):
+        """Set of (date, start_time) booked with start <= date < end."""
+        # Range on date server-side so only the range's bookings are read,
+        # however long the history gets. Needs the (status, date) composite
+        # index in firestore.indexes.json.
         docs = (
             self.db.collection("bookings")
             .where(filter=FieldFilter("status", "==", "confirmed"))
-            .stream()
+            .where(filter=FieldFilter("date", ">=", start))
+            .where(filter=FieldFilter("date", "<", end))
+            .select(["date", "start_time"])
+            .stream(transaction=transaction)
         )
         booked = set()
         for doc in docs:
             b = doc.to_dict()
-            if start <= b.get("date", "") < end:
-                booked.add((b["date"], b["start_time"]))
+            booked.add((b["date"], b["start_time"]))
         return booked
 
     # ── Users ──
@@ -210,36 +268,111 @@ class BookingService:
 
     # ── Booking ──
 
+    def _slot_lock_ref(self, date, start_time):
+        """slot_locks/{date}T{start_time}: exists exactly while a confirmed booking holds the slot."""
+        return self.db.collection("slot_locks").document(f"{date}T{start_time}")
+
+    def _read_booking_state(self, transaction, user_ref, dates, start_time):
+        """Every read book_sessions needs, as one batched get_all in the transaction:
+        the user and a slot lock per date.
+
+        Conflict detection is "does the lock exist", and because the locks are
+        in the transaction's read set, two bookers racing for the same slot
+        can't both commit. Bookers of different slots share no documents, so
+        they don't contend. Returns (user, {date: lock ref}).
+        """
+        locks = {date: self._slot_lock_ref(date, start_time) for date in dates}
+        snaps = {
+            snap.reference.path: snap
+            for snap in transaction.get_all([user_ref, *locks.values()])
+        }
+
+        user_doc = snaps[user_ref.path]
+        if not user_doc.exists:
+            raise ValueError("User not found")
+        for date in dates:
+            if snaps[locks[date].path].exists:
+                raise ValueError(f"Slot on {date} at {start_time} is already booked")
+        return user_doc.to_dict(), locks
+
+    def _sync_month(self, year, month, dates, start_time):
+        """Bring one month calendar in line with the slot locks for these
+        slots: locked means booked, unlocked means free (if a window offers it).
+
+        It derives the state from the locks rather than applying a delta,
+        so it is idempotent and a late run can't undo a newer booking or
+        cancellation.
+        """
+        calendar_ref = self._calendar_ref(year, month)
+        locks = {slot_calendar.slot_key(d, start_time): self._slot_lock_ref(d, start_time) for d in dates}
+
+        @firestore.transactional
+        def _sync(transaction):
+            snaps = {
+                snap.reference.path: snap
+                for snap in transaction.get_all([calendar_ref, *locks.values()])
+            }
+            calendar = snaps[calendar_ref.path]
+            if not calendar.exists:
+                return  # built from the bookings on first read
+            doc = calendar.to_dict()
+            booked = [key for key, ref in locks.items() if snaps[ref.path].exists]
+            freed = [key for key in locks if key not in booked and key in doc["booked"]]
+            if not freed and all(key in doc["booked"] for key in booked):
+                return
+            slot_calendar.mark_booked(doc, booked)
+            if freed:
+                availability = self.get_active_availability(transaction=transaction)
+                for key in freed:
+                    slot_calendar.release(doc, key, availability)
+            transaction.set(calendar_ref, {**doc, "updated_at": firestore.SERVER_TIMESTAMP})
+
+        _sync(self.db.transaction())
+
+    def _sync_calendar_slots(self, dates, start_time):
+        """Sync the month calendars after a booking has committed, one small
+        transaction per month, so the shared month document isn't in the
+        booking's write set.
+
+        A month that still fails (e.g. out of retries while many bookers
+        write the same month) is handed to the job queue to retry. The
+        booking stands either way, and the lock still rejects the slot.
+        """
+        by_month = {}
+        for date in dates:
+            by_month.setdefault((int(date[:4]), int(date[5:7])), []).append(date)
+
+        queued = []
+        for (year, month), month_dates in sorted(by_month.items()):
+            try:
+                self._sync_month(year, month, month_dates, start_time)
+            except Exception as e:
+                print(f"Slot calendar sync failed for {slot_calendar.month_key(year, month)}, queued: {e}")
+                queued.append(self.jobs.enqueue(
+                    SLOT_SYNC_JOB, {"year": year, "month": month, "dates": month_dates, "start_time": start_time},
+                    job_id=f"{SLOT_SYNC_JOB}-{uuid.uuid4()}"))
+        self.jobs.kick(queued)
+
+    def _slot_sync_job(self, payload):
+        self._sync_month(payload["year"], payload["month"], payload["dates"], payload["start_time"])
+
     def book_sessions(self, user_uid, start_time, end_time, duration_minutes, dates, note=""):
         """Book multiple sessions on specific dates at a given time.
         dates: list of date strings like ['2026-07-21', '2026-07-28', ...]
         Deducts len(dates) credits.
         """
+        if len(set(dates)) != len(dates):
+            raise ValueError("Each date can only be booked once")
+
         @firestore.transactional
         def _book(transaction, user_ref):
-            user_doc = user_ref.get(transaction=transaction)
-            if not user_doc.exists:
-                raise ValueError("User not found")
-            user = user_doc.to_dict()
+            user, locks = self._read_booking_state(transaction, user_ref, dates, start_time)
 
             needed = len(dates)
             remaining = user.get("sessions_remaining", 0)
             if remaining < needed:
                 raise ValueError(f"Not enough credits. Need {needed}, have {remaining}")
 
-            # Check none are already booked
-            for date in dates:
-                existing = (
-                    self.db.collection("bookings")
-                    .where(filter=FieldFilter("date", "==", date))
-                    .where(filter=FieldFilter("start_time", "==", start_time))
-                    .where(filter=FieldFilter("status", "==", "confirmed"))
-                    .limit(1)
-                    .stream()
-                )
-                if next(existing, None):
-                    raise ValueError(f"Slot on {date} at {start_time} is already booked")
-
             bookings = []
             for date in dates:
                 booking_id = str(uuid.uuid4())
@@ -253,17 +386,29 @@ class BookingService:
                     "duration_minutes": duration_minutes,
                     "note": note,
                     "status": "confirmed",
+                    "calendar_status": "pending",
                     "created_at": firestore.SERVER_TIMESTAMP,
                 }
                 transaction.set(
                     self.db.collection("bookings").document(booking_id), booking
                 )
+                transaction.set(locks[date], {
+                    "date": date,
+                    "start_time": start_time,
+                    "booking_id": booking_id,
+                    "user_uid": user_uid,
+                    "created_at": firestore.SERVER_TIMESTAMP,
+                })
                 bookings.append(booking)
 
             transaction.update(user_ref, {
                 "sessions_remaining": firestore.Increment(-needed),
             })
 
+            # One job for the whole booking, so its events go out as one batch.
+            self.jobs.enqueue(CALENDAR_JOB, {"booking_ids": [b["id"] for b in bookings]},
+                              job_id=f"{CALENDAR_JOB}-{bookings[0]['id']}", transaction=transaction)
+
             for b in bookings:
                 b["created_at"] = None
             return bookings
@@ -271,57 +416,127 @@ class BookingService:
         user_ref = self.db.collection("users").document(user_uid)
         transaction = self.db.transaction()
         bookings = _book(transaction, user_ref)
+        self._sync_calendar_slots(dates, start_time)
 
-        # Create calendar events with Meet links (after transaction succeeds)
-        user = self.get_user_profile(user_uid)
-        email = user.get("email", "") if user else ""
-        name = user.get("display_name", "") if user else ""
+        # Calendar events and Meet links are created by the job workers, so
+        # the request returns as soon as the credits are deducted.
+        self.jobs.kick([f"{CALENDAR_JOB}-{bookings[0]['id']}"])
+        return bookings
 
-        for booking in bookings:
-            try:
-                result = create_lesson_event(
-                    date=booking["date"],
-                    start_time=booking["start_time"],
-                    end_time=booking["end_time"],
-                    student_email=email,
-                    student_name=name,
-                )
-                if result:
-                    self.db.collection("bookings").document(booking["id"]).update({
-                        "meet_link": result.get("meet_link"),
-                        "calendar_event_id": result.get("event_id"),
-                        "calendar_html_link": result.get("html_link"),
-                    })
-                    booking["meet_link"] = result.get("meet_link")
-            except Exception as e:
-                # Don't fail the booking, but record why the calendar/Meet step
-                # failed so it's diagnosable instead of silently missing.
-                traceback.print_exc()
-                try:
-                    self.db.collection("bookings").document(booking["id"]).update({
-                        "calendar_error": str(e),
-                    })
-                except Exception:
-                    pass
-                print(f"Calendar event creation failed for {booking['date']}: {e}")
+    # ── Calendar provisioning (job queue) ──
+
+    def _calendar_job_bookings(self, payload):
+        """(ref, booking) for the job's bookings that are confirmed and still lack an event."""
+        # Jobs enqueued before batching carry a single booking_id.
+        ids = payload.get("booking_ids") or [payload["booking_id"]]
+        refs = [self.db.collection("bookings").document(booking_id) for booking_id in ids]
+        snaps = {snap.id: snap for snap in self.db.get_all(refs)}
+        pending = []
+        for ref in refs:
+            snap = snaps.get(ref.id)
+            booking = snap.to_dict() if snap and snap.exists else None
+            if booking and booking["status"] == "confirmed" and booking.get("calendar_status") != "ready":
+                pending.append((ref, booking))
+        return pending
+
+    def provision_calendar_events(self, payload):
+        """Job handler: create calendar events and Meet links for a booking's
+        sessions, in one batched Calendar call. Raises if any session failed,
+        so the job is retried; sessions that succeeded are skipped next time."""
+        pending = self._calendar_job_bookings(payload)
+        if not pending:
+            return
+
+        user = self.get_user_profile(pending[0][1]["user_uid"])
+        results = create_lesson_events(
+            [
+                {
+                    "date": booking["date"],
+                    "start_time": booking["start_time"],
+                    "end_time": booking["end_time"],
+                    "event_id": event_id_for(booking["id"]),
+                }
+                for _, booking in pending
+            ],
+            student_email=user.get("email", "") if user else pending[0][1].get("user_email", ""),
+            student_name=user.get("display_name", "") if user else "",
+        )
 
-        return bookings
+        batch = self.db.batch()
+        failed = []
+        for (ref, booking), result in zip(pending, results or [None] * len(pending)):
+            if result is None:
+                batch.update(ref, {"calendar_status": "not_configured"})
+            elif isinstance(result, Exception):
+                failed.append((booking["date"], result))
+                batch.update(ref, {"calendar_status": "retrying", "calendar_error": str(result)})
+            else:
+                batch.update(ref, {
+                    "calendar_status": "ready",
+                    "calendar_error": firestore.DELETE_FIELD,
+                    "meet_link": result.get("meet_link"),
+                    "calendar_event_id": result.get("event_id"),
+                    "calendar_html_link": result.get("html_link"),
+                })
+        batch.commit()
+
+        if failed:
+            date, error = failed[0]
+            raise RuntimeError(f"{len(failed)} of {len(pending)} calendar events failed (first: {date}: {error})")
+
+    def _calendar_job_failed(self, payload, error, final):
+        # Record why the calendar/Meet step failed so it's diagnosable
+        # instead of silently missing. Per-session errors recorded by the
+        # handler are kept; this covers the job failing as a whole.
+        pending = self._calendar_job_bookings(payload)
+        if not pending:
+            return
+        batch = self.db.batch()
+        for ref, booking in pending:
+            batch.update(ref, {
+                "calendar_status": "failed" if final else "retrying",
+                "calendar_error": booking.get("calendar_error") or str(error),
+            })
+        batch.commit()
 
     def cancel_booking(self, user_uid, booking_id):
         booking_ref = self.db.collection("bookings").document(booking_id)
-        booking_doc = booking_ref.get()
-
-        if not booking_doc.exists:
-            raise ValueError("Booking not found")
-        booking = booking_doc.to_dict()
-        if booking["user_uid"] != user_uid:
-            raise ValueError("Not your booking")
-        if booking["status"] != "confirmed":
-            raise ValueError("Booking cannot be cancelled")
-
-        booking_ref.update({"status": "cancelled"})
         user_ref = self.db.collection("users").document(user_uid)
-        user_ref.update({"sessions_remaining": firestore.Increment(1)})
+
+        @firestore.transactional
+        def _cancel(transaction):
+            booking_doc = booking_ref.get(transaction=transaction)
+            if not booking_doc.exists:
+                raise ValueError("Booking not found")
+            booking = booking_doc.to_dict()
+            if booking["user_uid"] != user_uid:
+                raise ValueError("Not your booking")
+            if booking["status"] != "confirmed":
+                raise ValueError("Booking cannot be cancelled")
+
+            # The lock and the month calendar are released in this same
+            # commit, so a booking of the freed slot can't interleave and
+            # be overwritten by a late release.
+            lock_ref = self._slot_lock_ref(booking["date"], booking["start_time"])
+            calendar_ref = self._calendar_ref(int(booking["date"][:4]), int(booking["date"][5:7]))
+            snaps = {snap.reference.path: snap for snap in transaction.get_all([lock_ref, calendar_ref])}
+            lock, calendar = snaps[lock_ref.path], snaps[calendar_ref.path]
+            availability = self.get_active_availability(transaction=transaction) if calendar.exists else []
+
+            transaction.update(booking_ref, {"status": "cancelled"})
+            transaction.update(user_ref, {"sessions_remaining": firestore.Increment(1)})
+            # Release the slot, unless the lock somehow belongs to another booking.
+            owner = lock.to_dict().get("booking_id") if lock.exists else None
+            if owner == booking_id:
+                transaction.delete(lock_ref)
+            if owner in (None, booking_id) and calendar.exists:
+                doc = calendar.to_dict()
+                key = slot_calendar.slot_key(booking["date"], booking["start_time"])
+                slot_calendar.release(doc, key, availability)
+                transaction.set(calendar_ref, {**doc, "updated_at": firestore.SERVER_TIMESTAMP})
+            return booking
+
+        _cancel(self.db.transaction())
 
     def get_user_bookings(self, user_uid):
         docs = (
@@ -333,16 +548,47 @@ class BookingService:
         bookings.sort(key=lambda b: (b.get("date", ""), b.get("start_time", "")))
         return bookings
 
-    def get_all_confirmed_bookings(self):
+    def get_confirmed_bookings_page(self, after=None, limit=50):
+        """One page of confirmed bookings from today on, in date and time order.
+
+        `after` is the cursor from the previous page. Confirmed bookings
+        have unique (date, start_time) pairs (see slot locks), so the pair
+        identifies a position exactly; it is passed around as
+        "{date}T{start_time}". Returns (bookings, next cursor or None).
+        """
         today = datetime.utcnow().strftime("%Y-%m-%d")
-        docs = (
+        query = (
             self.db.collection("bookings")
             .where(filter=FieldFilter("status", "==", "confirmed"))
-            .stream()
+            .where(filter=FieldFilter("date", ">=", today))
+            .order_by("date")
+            .order_by("start_time")
         )
-        bookings = [doc.to_dict() for doc in docs if doc.to_dict().get("date", "") >= today]
-        bookings.sort(key=lambda b: (b.get("date", ""), b.get("start_time", "")))
-        return bookings
+        if after:
+            date, start_time = after.split("T", 1)
+            query = query.start_after({"date": date, "start_time": start_time})
+        # One extra row tells us whether there is another page.
+        bookings = [doc.to_dict() for doc in query.limit(limit + 1).stream()]
+        if len(bookings) <= limit:
+            return bookings, None
+        bookings = bookings[:limit]
+        return bookings, f"{bookings[-1]['date']}T{bookings[-1]['start_time']}"
+
+    def iter_bookings(self, start, end, status=None):
+        """Bookings dated start..end (YYYY-MM-DD, inclusive) in date and time
+        order, yielded as Firestore streams them rather than collected into a list."""
+        query = self.db.collection("bookings")
+        if status:
+            query = query.where(filter=FieldFilter("status", "==", status))
+        query = (
+            query
+            .where(filter=FieldFilter("date", ">=", start))
+            .where(filter=FieldFilter("date", "<=", end))
+            .order_by("date")
+            .order_by("start_time")
+        )
+        for doc in query.stream():
+            yield doc.to_dict()
 
     # ── Purchases ──
 
@@ -1,8 +1,9 @@
+import hashlib
+import json
 import os
+import threading
 import time
 import uuid
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 
 try:
     from src.firebase_config import admin_sdk_config
@@ -26,14 +27,167 @@ CALENDAR_SUBJECT = (
 )
 
 
-def _get_service():
-    creds = service_account.Credentials.from_service_account_info(
-        admin_sdk_config, scopes=SCOPES
-    )
-    # Impersonate the Workspace user so Meet links and attendee invites work.
-    if CALENDAR_SUBJECT:
-        creds = creds.with_subject(CALENDAR_SUBJECT)
-    return build('calendar', 'v3', credentials=creds, cache_discovery=False)
+# Per-request socket timeout for Calendar API calls, in seconds.
+CALENDAR_TIMEOUT = float(os.getenv('GOOGLE_CALENDAR_TIMEOUT', 30))
+
+# host:port of a local fake Calendar API (scripts/fake_calendar.py). When
+# set, requests go there over plain HTTP without credentials.
+CALENDAR_EMULATOR_HOST = os.getenv('GOOGLE_CALENDAR_EMULATOR_HOST')
+
+# Requests per batch round trip. The API accepts up to 1000, but Google
+# recommends keeping batches to 50 or fewer.
+BATCH_LIMIT = 50
+
+# How many times to re-fetch events whose Meet conference is still provisioning.
+MEET_POLL_ATTEMPTS = 3
+
+
+class CalendarClient:
+    """One Calendar API client per process, shared across bookings.
+
+    The discovery-built service and the service-account credentials are
+    created once. The access token is refreshed under a lock, only when
+    google-auth considers it expired or close to expiring, so concurrent
+    bookings don't each fetch a new one.
+
+    httplib2 connections are not thread-safe, so every thread gets its own
+    authorised keep-alive connection, passed to execute().
+    """
+
+    def __init__(self, emulator_host=None):
+        self.emulator_host = emulator_host
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._credentials = None
+        self._service = None
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'token_refreshes': 0, 'token_refresh_seconds': 0.0,
+            'api_calls': 0, 'api_call_seconds': 0.0, 'api_errors': 0,
+            'batches': 0, 'batch_seconds': 0.0, 'batched_requests': 0,
+        }
+
+    def _record(self, count_key, seconds_key, started):
+        with self._stats_lock:
+            self._stats[count_key] += 1
+            self._stats[seconds_key] += time.perf_counter() - started
+
+    def service(self):
+        """The shared discovery-built Calendar v3 service."""
+        if self._service is None and self.emulator_host:
+            from google.auth.credentials import AnonymousCredentials
+            from googleapiclient.discovery import build_from_document
+            from googleapiclient.discovery_cache import get_static_doc
+
+            with self._lock:
+                if self._service is None:
+                    doc = json.loads(get_static_doc('calendar', 'v3'))
+                    doc['rootUrl'] = f"http://{self.emulator_host}/"
+                    doc['baseUrl'] = doc['rootUrl'] + doc['servicePath']
+                    self._credentials = AnonymousCredentials()
+                    self._service = build_from_document(doc, credentials=self._credentials)
+        if self._service is None:
+            # googleapiclient.discovery alone costs ~200 ms to import; only booking pays it.
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+
+            with self._lock:
+                if self._service is None:
+                    creds = service_account.Credentials.from_service_account_info(
+                        admin_sdk_config, scopes=SCOPES
+                    )
+                    # Impersonate the Workspace user so Meet links and attendee invites work.
+                    if CALENDAR_SUBJECT:
+                        creds = creds.with_subject(CALENDAR_SUBJECT)
+                    self._credentials = creds
+                    self._service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+        return self._service
+
+    def _ensure_token(self):
+        if self._credentials.valid:
+            return
+        from google.auth.transport.requests import Request
+
+        with self._refresh_lock:
+            if self._credentials.valid:
+                return
+            started = time.perf_counter()
+            self._credentials.refresh(Request())
+            self._record('token_refreshes', 'token_refresh_seconds', started)
+
+    def _http(self):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+
+            http = self._local.http = AuthorizedHttp(self._credentials, http=httplib2.Http(timeout=CALENDAR_TIMEOUT))
+        return http
+
+    def execute(self, request):
+        """Run a request built from service() on this thread's connection."""
+        self.service()
+        self._ensure_token()
+        http = self._http()
+        started = time.perf_counter()
+        try:
+            return request.execute(http=http)
+        except Exception:
+            with self._stats_lock:
+                self._stats['api_errors'] += 1
+            raise
+        finally:
+            self._record('api_calls', 'api_call_seconds', started)
+
+    def execute_batch(self, requests):
+        """Run requests built from service() as Calendar batch requests: one
+        round trip per BATCH_LIMIT requests instead of one each.
+
+        Returns a (response, exception) pair per request, in order; one
+        request failing doesn't fail the others.
+        """
+        service = self.service()
+        self._ensure_token()
+        http = self._http()
+        results = [None] * len(requests)
+
+        def collect(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        for offset in range(0, len(requests), BATCH_LIMIT):
+            chunk = requests[offset:offset + BATCH_LIMIT]
+            batch = service.new_batch_http_request(callback=collect)
+            for i, request in enumerate(chunk, offset):
+                batch.add(request, request_id=str(i))
+            started = time.perf_counter()
+            try:
+                batch.execute(http=http)
+            except Exception:
+                with self._stats_lock:
+                    self._stats['api_errors'] += 1
+                raise
+            finally:
+                self._record('batches', 'batch_seconds', started)
+            with self._stats_lock:
+                self._stats['batched_requests'] += len(chunk)
+        return results
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        for count_key, seconds_key, avg_key in (
+            ('token_refreshes', 'token_refresh_seconds', 'token_refresh_avg_ms'),
+            ('api_calls', 'api_call_seconds', 'api_call_avg_ms'),
+            ('batches', 'batch_seconds', 'batch_avg_ms'),
+        ):
+            count = stats[count_key]
+            stats[avg_key] = round(stats[seconds_key] * 1000 / count, 1) if count else None
+        stats['token_expiry'] = self._credentials.expiry.isoformat() if self._credentials and self._credentials.expiry else None
+        return stats
+
+
+calendar_client = CalendarClient(emulator_host=CALENDAR_EMULATOR_HOST)
 
 
 def _extract_meet_link(event):
@@ -45,39 +199,28 @@ def _extract_meet_link(event):
     return None
 
 
-def create_lesson_event(date, start_time, end_time, student_email, student_name=""):
-    """Create a Google Calendar event with a Meet link and invite the student.
+def event_id_for(key):
+    """A Calendar event id derived from `key` (e.g. a booking id). Event ids
+    may only use the base32hex alphabet (0-9, a-v), so hash the key."""
+    return hashlib.sha1(key.encode()).hexdigest()
 
-    Returns {event_id, meet_link, html_link} or None if calendar is not
-    configured. Raises on API errors so the caller can record why it failed.
-    """
-    # Impersonated subject owns a "primary" calendar we can fall back to.
-    target_calendar = CALENDAR_ID or ('primary' if CALENDAR_SUBJECT else None)
-    if not target_calendar:
-        return None
-
-    service = _get_service()
-
-    start_dt = f"{date}T{start_time}:00"
-    end_dt = f"{date}T{end_time}:00"
-
-    display = student_name or student_email
 
+def _lesson_event(lesson, student_email, display):
     event = {
         'summary': f"Tutoring: {display}",
         'description': f'1-on-1 programming tutoring session with {display}',
         'start': {
-            'dateTime': start_dt,
+            'dateTime': f"{lesson['date']}T{lesson['start_time']}:00",
             'timeZone': 'Europe/London',
         },
         'end': {
-            'dateTime': end_dt,
+            'dateTime': f"{lesson['date']}T{lesson['end_time']}:00",
             'timeZone': 'Europe/London',
         },
         'attendees': [{'email': student_email}] if student_email else [],
         'conferenceData': {
             'createRequest': {
-                'requestId': str(uuid.uuid4()),
+                'requestId': lesson.get('event_id') or str(uuid.uuid4()),
                 'conferenceSolutionKey': {'type': 'hangoutsMeet'},
             },
         },
@@ -89,30 +232,83 @@ def create_lesson_event(date, start_time, end_time, student_email, student_name=
             ],
         },
     }
+    if lesson.get('event_id'):
+        event['id'] = lesson['event_id']
+    return event
+
 
-    created = service.events().insert(
-        calendarId=target_calendar,
-        body=event,
-        conferenceDataVersion=1,
-        sendUpdates='all',  # emails the Meet invite to the student
-    ).execute()
+def create_lesson_events(lessons, student_email, student_name=""):
+    """Create a Calendar event with a Meet link for each lesson, inviting the
+    student, in batched round trips.
 
-    meet_link = _extract_meet_link(created)
+    lessons: [{date, start_time, end_time, event_id (optional)}]. With an
+    `event_id` (see event_id_for) the insert is idempotent: if an earlier
+    attempt already created the event, that event is fetched instead of
+    inserting a duplicate, so it is safe to retry.
+
+    An N-lesson booking costs one batched insert, plus one batched re-fetch
+    per round of waiting for Meet links, rather than an insert and up to
+    three polls per lesson.
+
+    Returns a list in lesson order, each {event_id, meet_link, html_link}
+    or the exception that lesson failed with; None if calendar is not
+    configured.
+    """
+    # Impersonated subject owns a "primary" calendar we can fall back to.
+    target_calendar = CALENDAR_ID or ('primary' if CALENDAR_SUBJECT else None)
+    if not target_calendar:
+        return None
+
+    from googleapiclient.errors import HttpError
+
+    service = calendar_client.service()
+    display = student_name or student_email
+    events = [None] * len(lessons)
+    errors = [None] * len(lessons)
+
+    inserts = calendar_client.execute_batch([
+        service.events().insert(
+            calendarId=target_calendar,
+            body=_lesson_event(lesson, student_email, display),
+            conferenceDataVersion=1,
+            sendUpdates='all',  # emails the Meet invite to the student
+        )
+        for lesson in lessons
+    ])
+    fetch = []
+    for i, (created, error) in enumerate(inserts):
+        if error is None:
+            events[i] = created
+        elif lessons[i].get('event_id') and isinstance(error, HttpError) and error.resp.status == 409:
+            fetch.append(i)  # a previous attempt already created this event
+        else:
+            errors[i] = error
 
     # The Meet conference can still be provisioning immediately after insert;
-    # re-fetch the event a few times until the link appears.
+    # re-fetch the events a few times until the links appear.
     attempts = 0
-    while not meet_link and attempts < 3:
+    while True:
+        if fetch:
+            fetched = calendar_client.execute_batch([
+                service.events().get(calendarId=target_calendar, eventId=lessons[i].get('event_id') or events[i]['id'])
+                for i in fetch
+            ])
+            for i, (event, error) in zip(fetch, fetched):
+                if error is None:
+                    events[i] = event
+                else:
+                    errors[i] = error
+        fetch = [i for i, event in enumerate(events) if event is not None and not _extract_meet_link(event)]
+        if not fetch or attempts == MEET_POLL_ATTEMPTS:
+            break
         time.sleep(1)
         attempts += 1
-        refreshed = service.events().get(
-            calendarId=target_calendar,
-            eventId=created['id'],
-        ).execute()
-        meet_link = _extract_meet_link(refreshed)
-
-    return {
-        'event_id': created.get('id'),
-        'meet_link': meet_link,
-        'html_link': created.get('htmlLink'),
-    }
+
+    return [
+        errors[i] or {
+            'event_id': events[i].get('id'),
+            'meet_link': _extract_meet_link(events[i]),
+            'html_link': events[i].get('htmlLink'),
+        }
+        for i in range(len(lessons))
+    ]
@@ -0,0 +1,48 @@
+"""Content-Encoding negotiation and gzip/brotli helpers.
+
+Content is compressed once at the highest level (at build time, or when
+the lazy minify cache or the page cache fills) and the stored variant is
+picked per request.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from src.http_headers import accept_qvalues
+except ImportError:
+    from http_headers import accept_qvalues
+
+# Preference order for negotiation.
+AVAILABLE_ENCODINGS = (['br'] if brotli else []) + ['gzip']
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+
+def negotiate_encoding(accept_encoding, available=AVAILABLE_ENCODINGS):
+    """Best encoding from `available` the client accepts, or None for identity.
+    `*` covers any encoding not listed explicitly."""
+    accepted = accept_qvalues(accept_encoding)
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    """One-shot, maximum-ratio compression for content that is stored and reused."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_variants(data):
+    """{'identity': data, 'gzip': ..., 'br': ...} for every available encoding."""
+    variants = {'identity': data}
+    for encoding in AVAILABLE_ENCODINGS:
+        variants[encoding] = compress(data, encoding)
+    return variants
+
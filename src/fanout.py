@@ -0,0 +1,93 @@
+"""Concurrent fan-out for page data loads.
+
+Pages that need several independent reads (a Firestore document, a query,
+a Stripe list) used to make them one after another, so the page waited for
+the sum of the round trips. fan_out() starts them together and waits for
+all of them, so it waits for the slowest one instead. The Firestore client
+multiplexes calls over one gRPC channel and the Stripe client uses a pooled
+session (see services.py), so both are safe to call from several threads.
+
+    data = fan_out(
+        profile=lambda: svc.get_user_profile(uid),
+        bookings=lambda: svc.get_user_bookings(uid),
+    )
+    data["profile"], data["bookings"], data.timings
+
+Calls run on a shared thread pool (FANOUT_WORKERS), except the first,
+which runs on the calling thread. The calls don't get the Flask request
+context, so read anything from `session` or `request` before fanning out.
+
+Every call is timed. Inside a request the timings are also collected on
+flask.g, and main adds them to the response's Server-Timing header, so
+they show up in the browser's network panel.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_request_context
+
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", 8))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+    return _pool
+
+
+class Loaded(dict):
+    """fan_out() results by name, with per-call durations in ms as .timings."""
+
+    def __init__(self, results, timings):
+        super().__init__(results)
+        self.timings = timings
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    try:
+        return fn(), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+
+def fan_out(**calls):
+    """Run the keyword callables concurrently and return their results as a
+    Loaded dict. Waits for every call; if any raised, the first one's
+    exception (in argument order) is re-raised."""
+    started = time.perf_counter()
+    names = list(calls)
+    if not names:
+        return Loaded({}, {})
+    futures = {name: _executor().submit(_timed, calls[name]) for name in names[1:]}
+    outcomes = {names[0]: _timed(calls[names[0]])}
+    for name, future in futures.items():
+        outcomes[name] = future.result()
+
+    timings = {name: round(seconds * 1000, 1) for name, (_, _, seconds) in outcomes.items()}
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    if has_request_context():
+        g.setdefault("fanout_timings", []).append(timings)
+
+    for name in names:
+        error = outcomes[name][1]
+        if error is not None:
+            raise error
+    return Loaded({name: outcomes[name][0] for name in names}, timings)
+
+
+def server_timing():
+    """Server-Timing header value for the current request's fan-outs, or None."""
+    entries = []
+    for i, timings in enumerate(g.get("fanout_timings", [])):
+        prefix = f"fanout{i + 1}-" if i else ""
+        entries.extend(f"{prefix}{name};dur={ms}" for name, ms in timings.items())
+    return ", ".join(entries) or None
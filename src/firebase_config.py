@@ -1,6 +1,5 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, storage, firestore, auth
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,22 +28,50 @@ admin_sdk_config = {
     "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_CERT_URL")
 }
 
-def initialize_firebase():
-    try:
+# firebase_admin and the Google Cloud clients take a few hundred ms to import,
+# so nothing here touches them until a route actually needs Firebase.
+_init_lock = threading.Lock()
+_UNSET = object()
+_storage_bucket = _UNSET
+
+
+def _ensure_app():
+    import firebase_admin
+    from firebase_admin import credentials
+    with _init_lock:
         if not firebase_admin._apps:
             cred = credentials.Certificate(admin_sdk_config)
             firebase_admin.initialize_app(cred, {
                 'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET")
             })
 
+
+def initialize_firebase():
+    try:
+        from firebase_admin import storage
+        _ensure_app()
         bucket = storage.bucket()
         return bucket
     except Exception as e:
         print(f"Error initializing Firebase: {e}")
         return None
 
+def get_storage_bucket():
+    """The Storage bucket, initialised on first call (None if Firebase is not configured)."""
+    global _storage_bucket
+    if _storage_bucket is _UNSET:
+        bucket = initialize_firebase()
+        with _init_lock:
+            if _storage_bucket is _UNSET:
+                _storage_bucket = bucket
+    return _storage_bucket
+
 def get_db():
+    from firebase_admin import firestore
+    _ensure_app()
     return firestore.client()
 
 def verify_token(id_token):
+    from firebase_admin import auth
+    _ensure_app()
     return auth.verify_id_token(id_token)
\ No newline at end of file
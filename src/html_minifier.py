@@ -0,0 +1,132 @@
+"""Single-pass HTML minifier.
+
+Tokenises the document once, left to right, instead of running several
+full-document regex substitutions:
+
+- comments are dropped;
+- whitespace-only text between tags is dropped, other text has whitespace
+  runs collapsed to one space;
+- whitespace inside tags is collapsed, but quoted attribute values are
+  left exactly as written;
+- the contents of <pre>, <textarea>, <script> and <style> pass through
+  untouched, so inline JS and preformatted text keep their whitespace.
+
+HtmlMinifier accepts the document in arbitrary chunks (e.g. Jinja's
+generate() stream) and emits minified output as soon as each token is
+complete; minify_html() is the one-shot form.
+"""
+import re
+
+RAW_TEXT_ELEMENTS = ('pre', 'textarea', 'script', 'style')
+
+_TOKEN = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|(?P<opencomment><!--)'
+    r'|(?P<decl><![^>]*>)'
+    r'|(?P<tag><(?P<close>/?)(?P<name>[a-zA-Z][\w:-]*)(?P<attrs>(?:[^>"\']|"[^"]*"|\'[^\']*\')*)>)'
+    # Whitespace-only text before the next tag is swallowed with the token
+    # it follows, so it never costs a loop iteration of its own.
+    r'(?:\s+(?=<))?'
+    r'|(?P<text>[^<]+)'
+    r'|(?P<lt><)',
+    re.DOTALL,
+)
+_TAG_WHITESPACE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+_WHITESPACE = re.compile(r'\s+')
+_RAW_END = {name: re.compile(rf'</{name}\s*>', re.IGNORECASE) for name in RAW_TEXT_ELEMENTS}
+
+
+def _collapse_tag(match):
+    return match.group(1) or ' '
+
+
+class HtmlMinifier:
+    def __init__(self):
+        self._buffer = ''
+        self._raw_end = None
+        self._started = False
+
+    def feed(self, chunk):
+        """Add more input; returns whatever output is already final."""
+        # Jinja yields Markup for expression output; concatenating onto a
+        # Markup buffer would escape everything after it.
+        self._buffer += str(chunk)
+        return self._drain(final=False)
+
+    def close(self):
+        """Flush the remaining input at end of document."""
+        out = self._drain(final=True)
+        self._buffer = ''
+        return out.rstrip()
+
+    def _drain(self, final):
+        buf = self._buffer
+        pos = 0
+        end = len(buf)
+        out = []
+        append = out.append
+        match_token = _TOKEN.match
+
+        while pos < end:
+            if self._raw_end:
+                close = self._raw_end.search(buf, pos)
+                if not close:
+                    if not final:
+                        break
+                    append(buf[pos:])
+                    pos = end
+                    break
+                append(buf[pos:close.end()])
+                pos = close.end()
+                self._raw_end = None
+                continue
+
+            match = match_token(buf, pos)
+            kind = match.lastgroup
+            token_end = match.end()
+            # A token touching the end of the buffer may continue in the next
+            # chunk: text could grow, a lone '<' or an unclosed comment could
+            # become a tag or comment.
+            if not final and (token_end == end or kind == 'lt' or kind == 'opencomment'):
+                break
+
+            if kind == 'tag':
+                close, name, attrs = match.group('close', 'name', 'attrs')
+                append(f"<{close}{name}{_TAG_WHITESPACE.sub(_collapse_tag, attrs)}>")
+                if not close:
+                    self._raw_end = _RAW_END.get(name.lower())
+                    if self._raw_end:
+                        token_end = match.end('tag')  # whitespace after <pre> is content
+            elif kind == 'text':
+                text = match.group('text')
+                if not text.isspace():
+                    append(_WHITESPACE.sub(' ', text))
+            elif kind == 'decl':
+                append(_WHITESPACE.sub(' ', match.group('decl')))
+            elif kind == 'lt' or kind == 'opencomment':
+                append(match.group(kind))
+            pos = token_end
+
+        self._buffer = buf[pos:]
+        output = ''.join(out)
+        if not self._started:
+            output = output.lstrip()
+            self._started = bool(output)
+        return output
+
+
+def minify_stream(chunks):
+    """Minify an iterable of HTML chunks, yielding output as it becomes final."""
+    minifier = HtmlMinifier()
+    for chunk in chunks:
+        out = minifier.feed(chunk)
+        if out:
+            yield out
+    out = minifier.close()
+    if out:
+        yield out
+
+
+def minify_html(html):
+    minifier = HtmlMinifier()
+    return minifier.feed(html) + minifier.close()
@@ -0,0 +1,28 @@
+"""Parsing for the Accept-family request headers (Accept, Accept-Encoding).
+
+Content negotiation for image formats and for compressed variants reads
+the same `token;q=value, ...` syntax, so both go through accept_qvalues()
+and agree on the edge cases. What a wildcard means is left to the caller.
+"""
+
+
+def accept_qvalues(header):
+    """{token: q} for an Accept-style header. Tokens are lower-cased. A
+    missing q is 1, a malformed one is 0 (not acceptable), and values are
+    clamped to 0-1. If a token is listed twice, its first entry wins."""
+    accepted = {}
+    for part in (header or '').split(','):
+        fields = part.strip().split(';')
+        token = fields[0].strip().lower()
+        if not token or token in accepted:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        accepted[token] = q
+    return accepted
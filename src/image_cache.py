@@ -0,0 +1,247 @@
+"""Rendition cache for resized photos.
+
+Two tiers sit in front of the Storage download + Pillow transform: a small
+in-process LRU and an on-disk store with a byte budget. Keys include the
+source blob's generation, so re-uploading an original never serves a stale
+rendition — the old entries simply age out.
+
+Cache misses go through SingleFlight, so a burst of identical requests
+(a page load, or the CDN fetching from several edges at once) runs one
+download + transform and the rest wait for its result.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv('IMAGE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'portfolio-renditions')
+MEMORY_BUDGET = int(os.getenv('IMAGE_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+DISK_BUDGET = int(os.getenv('IMAGE_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('IMAGE_SINGLE_FLIGHT_TIMEOUT', 30))
+
+
+def rendition_key(image_id, width, quality, generation, fmt='jpeg'):
+    """Stable, filesystem-safe key for one rendition of one blob generation."""
+    return f"{image_id}-w{width or 'orig'}-q{quality}-g{generation}.{fmt}"
+
+
+class _MemoryTier:
+    """Byte-bounded LRU of rendition bytes."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.budget:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._items[key] = data
+        self.size += len(data)
+        while self.size > self.budget:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class _DiskTier:
+    """Rendition files under CACHE_DIR, evicted oldest-access first."""
+
+    def __init__(self, directory, budget):
+        self.directory = directory
+        self.budget = budget
+        self.size = 0
+        self._files = OrderedDict()
+        self._available = self._load()
+
+    def _load(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.endswith('.tmp'):
+                    os.remove(path)
+                    continue
+                st = os.stat(path)
+                entries.append((st.st_atime, name, st.st_size))
+        except OSError as e:
+            print(f"Rendition disk cache disabled: {e}")
+            return False
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self.size += size
+        self._evict()
+        return True
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        if not self._available or key not in self._files:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.size -= self._files.pop(key, 0)
+            return None
+        self._files.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if not self._available or len(data) > self.budget:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Rendition disk cache write failed for {key}: {e}")
+            return
+        self.size -= self._files.pop(key, 0)
+        self._files[key] = len(data)
+        self.size += len(data)
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.budget and self._files:
+            name, size = self._files.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+
+class RenditionCache:
+    def __init__(self, directory=CACHE_DIR, memory_budget=MEMORY_BUDGET, disk_budget=DISK_BUDGET):
+        self._lock = threading.Lock()
+        self._memory = _MemoryTier(memory_budget)
+        self._disk = _DiskTier(directory, disk_budget)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns (bytes, tier) where tier is 'memory' or 'disk', or (None, None)."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self.memory_hits += 1
+                return data, 'memory'
+            data = self._disk.get(key)
+            if data is not None:
+                self._memory.put(key, data)
+                self.disk_hits += 1
+                return data, 'disk'
+            self.misses += 1
+            return None, None
+
+    def size_of(self, key):
+        """Byte size of a cached rendition without reading it or counting a hit."""
+        with self._lock:
+            data = self._memory._items.get(key)
+            if data is not None:
+                return len(data)
+            return self._disk._files.get(key)
+
+    def put(self, key, data):
+        with self._lock:
+            self._memory.put(key, data)
+            self._disk.put(key, data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory._items),
+                'memory_bytes': self._memory.size,
+                'memory_budget': self._memory.budget,
+                'disk_entries': len(self._disk._files),
+                'disk_bytes': self._disk.size,
+                'disk_budget': self._disk.budget,
+            }
+
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution."""
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.executed = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+
+    def do(self, key, fn):
+        """Returns (result, shared). Only the first caller for `key` runs `fn`;
+        callers arriving while it runs wait up to `timeout` seconds and get
+        the same result, or the same exception re-raised."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executed += 1
+            else:
+                self.deduplicated += 1
+
+        if leader:
+            try:
+                flight.result = fn()
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.result, False
+
+        if not flight.done.wait(self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise SingleFlightTimeout(f"Timed out after {self.timeout}s waiting for {key}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'deduplicated': self.deduplicated,
+                'timeouts': self.timeouts,
+                'in_flight': len(self._flights),
+            }
+
+
+rendition_cache = RenditionCache()
+rendition_flights = SingleFlight()
@@ -0,0 +1,207 @@
+"""In-memory index of the photos under images/{id}/ in Firebase Storage.
+
+Pre-built renditions written by scripts/generate_renditions.py are indexed
+alongside the originals so the route can serve them without Pillow.
+
+Manifest details (dimensions, dominant colour, blur placeholder) are stored
+as custom metadata on each original, tagged with the generation they were
+computed from, so they come back with the listing and are only recomputed
+when a photo is replaced. Photos without them (new uploads that
+generate_renditions.py hasn't seen yet) are listed without dimensions;
+public requests never download or describe originals. Running
+generate_renditions.py or the admin refresh endpoint fills them in.
+
+One prefix listing populates it; after that `/api/images` and
+`/images/<id>` read from a dict instead of listing Storage per request.
+The index refreshes itself once it is older than IMAGE_INDEX_TTL seconds,
+or immediately through the admin refresh endpoint. Only the first load
+makes requests wait: after that, one request re-lists while the others
+keep reading the previous index, and if listing fails the previous index
+stays in service and the refresh is retried REFRESH_RETRY_SECONDS later.
+"""
+import os
+import threading
+import time
+
+try:
+    from src.image_processing import RENDITION_PREFIX, parse_rendition_blob_name, describe
+except ImportError:
+    from image_processing import RENDITION_PREFIX, parse_rendition_blob_name, describe
+
+INDEX_TTL = int(os.getenv('IMAGE_INDEX_TTL', 300))
+REFRESH_RETRY_SECONDS = 30
+
+
+_DESCRIPTION_FIELDS = ('width', 'height', 'dominant_color', 'placeholder')
+
+
+def _stored_description(blob):
+    metadata = blob.metadata or {}
+    if metadata.get('described_generation') != str(blob.generation):
+        return None
+    try:
+        return {
+            'width': int(metadata['width']),
+            'height': int(metadata['height']),
+            'dominant_color': metadata['dominant_color'],
+            'placeholder': metadata['placeholder'],
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def _parse_blob(blob):
+    """Returns an index entry for images/{id}/{filename}.JPEG blobs, else None."""
+    parts = blob.name.split('/')
+    if len(parts) != 3 or parts[0] != 'images':
+        return None
+    try:
+        image_id = int(parts[1])
+    except ValueError:
+        return None
+    filename = parts[2]
+    if not filename.lower().endswith(('.jpeg', '.jpg')):
+        return None
+    return {
+        'id': image_id,
+        'title': filename.rsplit('.', 1)[0],
+        'filename': filename,
+        'blob_name': blob.name,
+        'generation': blob.generation,
+        'size': blob.size,
+        'content_type': blob.content_type or 'image/jpeg',
+        'updated': blob.updated,
+        'description': _stored_description(blob),
+    }
+
+
+def _parse_rendition(blob):
+    parsed = parse_rendition_blob_name(blob.name)
+    if not parsed:
+        return None
+    return parsed, {
+        'blob_name': blob.name,
+        'generation': blob.generation,
+        'size': blob.size,
+        'source_generation': (blob.metadata or {}).get('source_generation'),
+    }
+
+
+class ImageIndex:
+    def __init__(self, get_bucket, ttl=INDEX_TTL):
+        self._get_bucket = get_bucket
+        self.ttl = ttl
+        self._entries = {}
+        self._renditions = {}
+        self._loaded_at = None
+        self._retry_at = 0
+        self._refresh_error = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self):
+        now = time.monotonic()
+        return now - self._loaded_at > self.ttl and now >= self._retry_at
+
+    def refresh(self):
+        """Re-list images/ and atomically swap in the new index."""
+        with self._lock:
+            return self._load()
+
+    def _load(self):
+        bucket = self._get_bucket()
+        if not bucket:
+            raise RuntimeError("Firebase Storage not initialized")
+        entries = {}
+        for blob in bucket.list_blobs(prefix='images/'):
+            entry = _parse_blob(blob)
+            # Keep the first JPEG per folder, matching listing order.
+            if entry and entry['id'] not in entries:
+                entries[entry['id']] = entry
+        renditions = {}
+        for blob in bucket.list_blobs(prefix=RENDITION_PREFIX):
+            parsed = _parse_rendition(blob)
+            if parsed:
+                renditions[parsed[0]] = parsed[1]
+        self._entries = entries
+        self._renditions = renditions
+        self._loaded_at = time.monotonic()
+        self._refresh_error = None
+        return len(entries)
+
+    def _current(self):
+        if self._loaded_at is None:
+            with self._lock:
+                # Another request may have loaded it while we waited.
+                if self._loaded_at is None:
+                    self._load()
+        elif self._is_stale() and self._lock.acquire(blocking=False):
+            # This request re-lists; concurrent ones read the previous index.
+            try:
+                if self._is_stale():
+                    self._load()
+            except Exception as e:
+                self._retry_at = time.monotonic() + min(self.ttl, REFRESH_RETRY_SECONDS)
+                self._refresh_error = str(e)
+                print(f"Image index refresh failed, serving the previous listing: {e}")
+            finally:
+                self._lock.release()
+        return self._entries
+
+    def get(self, image_id):
+        return self._current().get(image_id)
+
+    def all(self):
+        entries = self._current()
+        return [entries[key] for key in sorted(entries)]
+
+    def prebuilt(self, entry, width, quality, fmt='jpeg'):
+        """Pre-built rendition for `entry` if one exists for its current generation."""
+        rendition = self._renditions.get((entry['id'], width, quality, fmt))
+        if rendition and rendition['source_generation'] == str(entry['generation']):
+            return rendition
+        return None
+
+    def store_description(self, entry, description):
+        """Persist manifest details onto the original's custom metadata."""
+        blob = self.blob(entry)
+        metadata = {field: str(description[field]) for field in _DESCRIPTION_FIELDS}
+        metadata['described_generation'] = str(entry['generation'])
+        blob.metadata = metadata
+        blob.patch()
+        entry['description'] = description
+
+    def describe(self, entry):
+        """Manifest details for an entry, computing and storing them on first use."""
+        if not entry.get('description'):
+            self.store_description(entry, describe(self.blob(entry).download_as_bytes()))
+        return entry['description']
+
+    def describe_missing(self, budget_seconds):
+        """Describe indexed photos that lack manifest details, one at a time,
+        until `budget_seconds` have passed. Returns {described, failed, remaining}."""
+        deadline = time.monotonic() + budget_seconds
+        missing = [entry for entry in self.all() if not entry.get('description')]
+        described, failed = 0, []
+        for entry in missing:
+            if time.monotonic() >= deadline:
+                break
+            try:
+                self.describe(entry)
+                described += 1
+            except Exception as e:
+                failed.append(entry['id'])
+                print(f"Could not describe image {entry['id']}: {e}")
+        return {'described': described, 'failed': failed, 'remaining': len(missing) - described - len(failed)}
+
+    def blob(self, entry):
+        """Storage blob for an original or rendition entry, pinned to the indexed generation."""
+        return self._get_bucket().blob(entry['blob_name'], generation=entry['generation'])
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'prebuilt_renditions': len(self._renditions),
+            'ttl': self.ttl,
+            'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            'refresh_error': self._refresh_error,
+        }
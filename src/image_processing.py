@@ -0,0 +1,257 @@
+"""Pillow transforms shared by the /images route and the rendition CLI."""
+import base64
+import functools
+import io
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    from src.http_headers import accept_qvalues
+except ImportError:
+    from http_headers import accept_qvalues
+
+# Renditions the front end asks for: the masonry grid in index.js and the
+# regular tiles in photos.html use 600@80, large/wide tiles use 800@85, and
+# the lightbox/modal uses 1200@95.
+PREBUILT_RENDITIONS = [(600, 80), (800, 85), (1200, 95)]
+PREBUILT_FORMATS = ['jpeg', 'webp']
+RENDITION_PREFIX = 'renditions/'
+
+# format -> (Pillow format name, mimetype, file extension)
+FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'avif': ('AVIF', 'image/avif', 'avif'),
+}
+_EXTENSIONS = {ext: fmt for fmt, (_, _, ext) in FORMATS.items()}
+
+
+def _ladder(env_name, default):
+    return sorted({int(v) for v in os.getenv(env_name, default).split(',') if v.strip()})
+
+
+# The only widths/qualities /images/<id> renders. Anything else snaps to the
+# nearest rung, which keeps the set of distinct renditions (and cache
+# entries) small and stops arbitrary widths from forcing huge upscales.
+WIDTH_LADDER = _ladder('IMAGE_WIDTH_LADDER', '320,600,800,1200,1600')
+QUALITY_LADDER = _ladder('IMAGE_QUALITY_LADDER', '60,75,80,85,95')
+DEFAULT_QUALITY = 75
+
+# Blur-up placeholder embedded in the /api/images manifest, and the width
+# the dominant colour is sampled at.
+PLACEHOLDER_WIDTH = 16
+DESCRIBE_WIDTH = 64
+
+# Decoded pixels allowed per request (after draft scaling), and how many
+# decodes may run at once before further requests wait, then get a 503.
+MAX_DECODE_PIXELS = int(os.getenv('IMAGE_MAX_DECODE_PIXELS', 40_000_000))
+MAX_CONCURRENT_DECODES = int(os.getenv('IMAGE_MAX_CONCURRENT_DECODES', 2))
+DECODE_WAIT_SECONDS = float(os.getenv('IMAGE_DECODE_WAIT_SECONDS', 10))
+
+_decode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_DECODES)
+
+
+@functools.lru_cache(maxsize=None)
+def _pil():
+    """PIL.Image, imported on first use rather than when the app starts."""
+    from PIL import Image
+    try:
+        # Registers AVIF on Pillow builds that predate native support.
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    return Image
+
+
+@functools.lru_cache(maxsize=None)
+def supported_formats():
+    from PIL import features
+    Image = _pil()
+    Image.init()
+    supported = ['jpeg']
+    if features.check_module('webp'):
+        supported.append('webp')
+    if 'AVIF' in Image.SAVE:
+        supported.append('avif')
+    return tuple(supported)
+
+
+def negotiate_format(accept_header):
+    """Pick the best output format the client explicitly accepts.
+
+    Preference is AVIF, then WebP, then JPEG. Wildcards (`*/*`, `image/*`)
+    don't count, so a bare `Accept: */*` still gets the universally safe JPEG.
+    """
+    accepted = accept_qvalues(accept_header)
+    for fmt in ('avif', 'webp'):
+        if fmt in supported_formats() and accepted.get(FORMATS[fmt][1], 0) > 0:
+            return fmt
+    return 'jpeg'
+
+
+def _nearest(ladder, value):
+    # Ties go to the larger rung so snapping never loses detail.
+    return min(ladder, key=lambda rung: (abs(rung - value), -rung))
+
+
+def canonical_params(width, quality):
+    """Snap a requested (width, quality) onto the ladders.
+
+    A missing width means the largest rung rather than the full original.
+    """
+    width = WIDTH_LADDER[-1] if width is None else _nearest(WIDTH_LADDER, width)
+    quality = DEFAULT_QUALITY if quality is None else quality
+    return width, _nearest(QUALITY_LADDER, quality)
+
+
+def mimetype_for(fmt):
+    return FORMATS[fmt][1]
+
+
+def rendition_blob_name(image_id, width, quality, fmt='jpeg'):
+    return f"{RENDITION_PREFIX}{image_id}/w{width}-q{quality}.{FORMATS[fmt][2]}"
+
+
+def parse_rendition_blob_name(name):
+    """Returns (image_id, width, quality, fmt) for renditions/{id}/w{w}-q{q}.{ext}, else None."""
+    parts = name.split('/')
+    if len(parts) != 3 or parts[0] + '/' != RENDITION_PREFIX:
+        return None
+    stem, _, ext = parts[2].rpartition('.')
+    if ext not in _EXTENSIONS or not stem.startswith('w') or '-q' not in stem:
+        return None
+    try:
+        w, q = stem[1:].split('-q', 1)
+        return int(parts[1]), int(w), int(q), _EXTENSIONS[ext]
+    except ValueError:
+        return None
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+class DecoderBusy(RuntimeError):
+    pass
+
+
+@contextmanager
+def _decode_slot():
+    """Bound how many originals are decoded at once across the process."""
+    if not _decode_slots.acquire(timeout=DECODE_WAIT_SECONDS):
+        raise DecoderBusy("Too many images being processed, try again shortly")
+    try:
+        yield
+    finally:
+        _decode_slots.release()
+
+
+def _open_scaled(image_bytes, width=None):
+    """Open an original, letting the decoder skip resolution we will throw away.
+
+    For JPEGs, draft() asks libjpeg for a DCT-scaled decode (1/2, 1/4 or 1/8)
+    that is still at least `width` wide, so a w=600 request against a 6000px
+    original decodes ~750px instead of 6000px. The decoded size is checked
+    against IMAGE_MAX_DECODE_PIXELS before any pixel data is loaded.
+    """
+    img = _pil().open(io.BytesIO(image_bytes))
+    if width and width < img.width and img.format == 'JPEG':
+        img.draft('RGB', (width, max(1, img.height * width // img.width)))
+    if img.width * img.height > MAX_DECODE_PIXELS:
+        img.close()
+        raise ImageTooLarge(f"Image is {img.width}x{img.height}, over the {MAX_DECODE_PIXELS} pixel decode limit")
+    if img.mode in ('RGBA', 'LA', 'P', 'CMYK'):
+        img = img.convert('RGB')
+    return img
+
+
+def _fit_width(img, width, aspect):
+    """Downscale to `width` (never upscale): integer reduce() first, then LANCZOS."""
+    if not width or width >= img.width:
+        return img
+    factor = img.width // (width * 2)
+    if factor > 1:
+        img = img.reduce(factor)
+    height = max(1, round(width / aspect))
+    return img.resize((width, height), _pil().Resampling.LANCZOS)
+
+
+def _encode(img, quality, fmt='jpeg'):
+    img_io = io.BytesIO()
+    if fmt == 'webp':
+        img.save(img_io, 'WEBP', quality=quality, method=4)
+    elif fmt == 'avif':
+        img.save(img_io, 'AVIF', quality=quality, speed=8)
+    else:
+        img.save(img_io, 'JPEG', quality=quality, optimize=True)
+    return img_io.getvalue()
+
+
+def _source_aspect(image_bytes):
+    with _pil().open(io.BytesIO(image_bytes)) as img:
+        return img.width / img.height
+
+
+def render(image_bytes, width=None, quality=75, fmt='jpeg'):
+    """Decode an original, optionally downscale to `width`, and encode as `fmt`."""
+    aspect = _source_aspect(image_bytes)
+    with _decode_slot(), _open_scaled(image_bytes, width) as img:
+        return _encode(_fit_width(img, width, aspect), quality, fmt)
+
+
+def _render_specs(img, specs, aspect):
+    resized = {}
+    out = []
+    for width, quality, fmt in specs:
+        if width not in resized:
+            resized[width] = _fit_width(img, width, aspect)
+        out.append(_encode(resized[width], quality, fmt))
+    return out
+
+
+def render_many(image_bytes, specs):
+    """Render several (width, quality, fmt) specs from one decode; returns bytes in order."""
+    aspect = _source_aspect(image_bytes)
+    widths = [spec[0] for spec in specs]
+    draft_width = None if None in widths else max(widths)
+    with _decode_slot(), _open_scaled(image_bytes, draft_width) as img:
+        return _render_specs(img, specs, aspect)
+
+
+def render_and_describe(image_bytes, specs):
+    """render_many() and describe() from the same decode: (renditions, description)."""
+    with _pil().open(io.BytesIO(image_bytes)) as probe:
+        width, height = probe.size
+    widths = [spec[0] for spec in specs]
+    draft_width = None if None in widths else max(widths + [DESCRIBE_WIDTH])
+    with _decode_slot(), _open_scaled(image_bytes, draft_width) as img:
+        return _render_specs(img, specs, width / height), _describe_decoded(img, width, height)
+
+
+def describe(image_bytes):
+    """Manifest details for an original: intrinsic size, dominant colour and a
+    tiny blurred placeholder as a data URI."""
+    with _pil().open(io.BytesIO(image_bytes)) as probe:
+        width, height = probe.size
+    with _decode_slot(), _open_scaled(image_bytes, DESCRIBE_WIDTH) as img:
+        return _describe_decoded(img, width, height)
+
+
+def _describe_decoded(img, width, height):
+    """describe() from an open, possibly draft-scaled, image of a width x height original."""
+    aspect = width / height
+    small = _fit_width(img, DESCRIBE_WIDTH, aspect).convert('RGB')
+    palette = small.quantize(colors=5)
+    _, index = max(palette.getcolors())
+    r, g, b = palette.getpalette()[index * 3:index * 3 + 3]
+    from PIL import ImageFilter
+    thumb = _fit_width(small, PLACEHOLDER_WIDTH, aspect).filter(ImageFilter.GaussianBlur(1))
+    fmt = 'webp' if 'webp' in supported_formats() else 'jpeg'
+    placeholder = base64.b64encode(_encode(thumb, 40, fmt)).decode('ascii')
+    return {
+        'width': width,
+        'height': height,
+        'dominant_color': f"#{r:02x}{g:02x}{b:02x}",
+        'placeholder': f"data:{mimetype_for(fmt)};base64,{placeholder}",
+    }
@@ -0,0 +1,232 @@
+"""Durable background jobs, stored in Firestore (jobs/{id}) and run by a
+small local worker pool.
+
+A job document is the source of truth:
+
+    {
+        "kind": "calendar_event", "payload": {...},
+        "status": "pending" | "running" | "retrying" | "done" | "failed",
+        "attempts": 0, "run_at": <when it may next run>,
+        "lease_until": <while running>, "last_error": "...",
+    }
+
+Enqueue jobs inside the transaction that creates the work (so the job
+exists if and only if the transaction commits), then kick() them after the
+commit to start them on this process's workers straight away. A poller
+thread also sweeps for due jobs every JOB_POLL_SECONDS, which picks up
+retries and anything a previous process left behind: jobs that were
+pending when it stopped, or running under a lease that has since expired.
+
+On serverless hosts (Vercel) the function is frozen once the response is
+sent, so background threads can't be relied on. There JOB_WORKERS
+defaults to 0: kick() does nothing and jobs only run from run_due(),
+which the sweep endpoint /tutoring/admin/run-jobs (called by an external
+scheduler, see .env.example) and scripts/run_jobs.py call.
+
+Each run claims the job in a transaction (status -> running, with a
+lease), so a job only runs on one worker at a time even with several
+processes. A failed run is retried with exponential backoff until
+JOB_MAX_ATTEMPTS; handlers should therefore be idempotent.
+"""
+import os
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+COLLECTION = "jobs"
+
+# No local workers by default on Vercel, where threads stop with the response.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 0 if os.getenv("VERCEL") else 2))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 6))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", 5))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", 900))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 120))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 30))
+
+WAITING = ["pending", "retrying"]
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts` (1-based): doubling, capped, +-20% jitter."""
+    delay = min(JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), JOB_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class JobQueue:
+    def __init__(self, db, workers=JOB_WORKERS):
+        self.db = db
+        self.workers = workers
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._poller = None
+        self._counts = {"enqueued": 0, "done": 0, "retried": 0, "failed": 0, "skipped": 0}
+
+    def register(self, kind, handler, on_failure=None):
+        """handler(payload) does the work; raising schedules a retry.
+        on_failure(payload, error, final) is told about every failed run,
+        with final=True once the job has used its last attempt."""
+        self._handlers[kind] = (handler, on_failure)
+
+    def _ref(self, job_id):
+        return self.db.collection(COLLECTION).document(job_id)
+
+    # ── Enqueue ──
+
+    def enqueue(self, kind, payload, job_id, transaction=None):
+        """Write a pending job. Pass the caller's transaction to make the job
+        part of it; call kick() with the id once that has committed."""
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "run_at": _now(),
+            "created_at": _now(),
+        }
+        if transaction is not None:
+            transaction.set(self._ref(job_id), job)
+        else:
+            self._ref(job_id).set(job)
+        with self._lock:
+            self._counts["enqueued"] += 1
+        return job_id
+
+    def kick(self, job_ids):
+        """Run these jobs on the local workers now (they must be committed).
+        Without local workers they wait for the next run_due() sweep."""
+        if not self.workers:
+            return
+        pool = self._start()
+        for job_id in job_ids:
+            pool.submit(self.run, job_id)
+
+    # ── Workers ──
+
+    def _start(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+                    self._poller = threading.Thread(target=self._poll, name="job-poller", daemon=True)
+                    self._poller.start()
+        return self._pool
+
+    def _poll(self):
+        while True:
+            time.sleep(JOB_POLL_SECONDS)
+            try:
+                self.kick(self.due_jobs())
+            except Exception:
+                traceback.print_exc()
+
+    def due_jobs(self, limit=50):
+        """Ids of jobs that may run now: waiting and due, or running with an expired lease."""
+        now = _now()
+        waiting = (
+            self.db.collection(COLLECTION)
+            .where(filter=FieldFilter("status", "in", WAITING))
+            .where(filter=FieldFilter("run_at", "<=", now))
+            .limit(limit)
+            .select(["status"])
+            .stream()
+        )
+        stalled = (
+            self.db.collection(COLLECTION)
+            .where(filter=FieldFilter("status", "==", "running"))
+            .where(filter=FieldFilter("lease_until", "<=", now))
+            .limit(limit)
+            .select(["status"])
+            .stream()
+        )
+        return [doc.id for doc in waiting] + [doc.id for doc in stalled]
+
+    def run_due(self, limit=50, budget_seconds=None):
+        """Run due jobs one after another on this thread, stopping early once
+        `budget_seconds` have passed. Returns {status: count}."""
+        started = time.monotonic()
+        results = {}
+        for job_id in self.due_jobs(limit=limit):
+            if budget_seconds is not None and time.monotonic() - started > budget_seconds:
+                results["deferred"] = results.get("deferred", 0) + 1
+                continue
+            status = self.run(job_id) or "not due"
+            results[status] = results.get(status, 0) + 1
+        return results
+
+    def _claim(self, job_id):
+        @firestore.transactional
+        def _take(transaction):
+            snap = self._ref(job_id).get(transaction=transaction)
+            if not snap.exists:
+                return None
+            job = snap.to_dict()
+            now = _now()
+            if job["status"] in WAITING:
+                if job["run_at"] > now:
+                    return None
+            elif job["status"] != "running" or job.get("lease_until", now) > now:
+                return None
+            job["attempts"] = job.get("attempts", 0) + 1
+            transaction.update(self._ref(job_id), {
+                "status": "running",
+                "attempts": job["attempts"],
+                "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+            })
+            return job
+
+        return _take(self.db.transaction())
+
+    def run(self, job_id):
+        """Claim and run one job. Returns its new status, or None if it wasn't due."""
+        job = self._claim(job_id)
+        if job is None:
+            with self._lock:
+                self._counts["skipped"] += 1
+            return None
+
+        handler, on_failure = self._handlers[job["kind"]]
+        try:
+            handler(job["payload"])
+        except Exception as e:
+            traceback.print_exc()
+            final = job["attempts"] >= JOB_MAX_ATTEMPTS
+            delay = 0 if final else backoff_seconds(job["attempts"])
+            update = {"status": "failed" if final else "retrying", "last_error": str(e)}
+            if not final:
+                update["run_at"] = _now() + timedelta(seconds=delay)
+            self._ref(job_id).update(update)
+            with self._lock:
+                self._counts["failed" if final else "retried"] += 1
+            print(f"Job {job_id} ({job['kind']}) attempt {job['attempts']} failed: {e}"
+                  + ("" if final else f"; retrying in {delay:.0f}s"))
+            if on_failure:
+                try:
+                    on_failure(job["payload"], e, final)
+                except Exception:
+                    traceback.print_exc()
+            if not final and self.workers:
+                timer = threading.Timer(delay, self.kick, args=([job_id],))
+                timer.daemon = True
+                timer.start()
+            return update["status"]
+
+        self._ref(job_id).update({"status": "done", "finished_at": _now()})
+        with self._lock:
+            self._counts["done"] += 1
+        return "done"
+
+    def stats(self):
+        with self._lock:
+            return {**self._counts, "workers": self.workers, "started": self._pool is not None}
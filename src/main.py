@@ -1,111 +1,207 @@
-from flask import Flask, send_from_directory, render_template, request, Response, jsonify, session
-from PIL import Image
-import io
+import time
+_BOOT_STARTED = time.perf_counter()
+
+from flask import Flask, send_from_directory, stream_template, request, Response, jsonify, session, redirect, url_for
 import os
-import re
+import sys
 import json
-import cssmin
-import rjsmin
-import stripe
+import hashlib
+from datetime import datetime, timezone
 
+# Heavy dependencies (Firebase, Firestore, stripe, the Calendar client, Pillow,
+# the JS/CSS minifiers) are imported by the code paths that use them, not
+# here, so a cold instance answering a static asset doesn't wait for them.
 try:
-    from src.firebase_config import initialize_firebase
-    from src.stripe_bluprnt import blueprint
+    from src.firebase_config import get_storage_bucket
+    from src.stripe_bluprnt import blueprint, require_admin
+    from src.image_cache import rendition_cache, rendition_flights, rendition_key, SingleFlightTimeout
+    from src.image_index import ImageIndex
+    from src.assets import asset_url, get_built
+    from src.html_minifier import minify_stream
+    from src.fanout import server_timing
+    from src.compression import AVAILABLE_ENCODINGS, negotiate_encoding, compress_variants
+    from src.image_processing import render, negotiate_format, mimetype_for, canonical_params, ImageTooLarge, DecoderBusy
 except ImportError:
-    from firebase_config import initialize_firebase
-    from stripe_bluprnt import blueprint
-
-stripe.api_key = os.getenv("STRIPE_API_KEY")
+    from firebase_config import get_storage_bucket
+    from stripe_bluprnt import blueprint, require_admin
+    from image_cache import rendition_cache, rendition_flights, rendition_key, SingleFlightTimeout
+    from image_index import ImageIndex
+    from assets import asset_url, get_built
+    from html_minifier import minify_stream
+    from fanout import server_timing
+    from compression import AVAILABLE_ENCODINGS, negotiate_encoding, compress_variants
+    from image_processing import render, negotiate_format, mimetype_for, canonical_params, ImageTooLarge, DecoderBusy
+
+# Off-ladder /images requests: 'redirect' to the canonical URL or 'reject' with a 400
+IMAGE_LADDER_MODE = os.getenv('IMAGE_LADDER_MODE', 'redirect')
+
+# Browser/CDN cache lifetimes. URLs carrying a matching ?v= fingerprint never
+# change content, so those are cached for a year and marked immutable.
+ASSET_MAX_AGE = int(os.getenv('ASSET_MAX_AGE', 3600))
+IMAGE_MAX_AGE = int(os.getenv('IMAGE_MAX_AGE', 86400))
+IMMUTABLE_MAX_AGE = 31536000
+
+# Time the admin refresh spends describing photos generate_renditions.py hasn't seen
+IMAGE_DESCRIBE_BUDGET_SECONDS = float(os.getenv('IMAGE_DESCRIBE_BUDGET_SECONDS', 20))
 
 app = Flask(__name__, template_folder='../src/templates', static_folder='../src/static')
 app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-change-me')
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = ASSET_MAX_AGE
 app.register_blueprint(blueprint)
+app.jinja_env.globals['asset_url'] = asset_url
 
-storage_bucket = initialize_firebase()
+image_index = ImageIndex(get_storage_bucket)
 
 _min_cache = {}
-
-def minify_html(html):
-    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
-    html = re.sub(r'>\s+<', '><', html)
-    html = re.sub(r'\s{2,}', ' ', html)
-    return html.strip()
+_page_cache = {}
 
 def get_minified(filepath, minifier):
+    """Minified bytes plus gzip/brotli variants, computed once per file mtime."""
     mtime = os.path.getmtime(filepath)
     if filepath in _min_cache and _min_cache[filepath][0] == mtime:
         return _min_cache[filepath][1]
     with open(filepath, 'r') as f:
         content = f.read()
-    minified = minifier(content)
-    _min_cache[filepath] = (mtime, minified)
-    return minified
+    variants = compress_variants(minifier(content).encode('utf-8'))
+    _min_cache[filepath] = (mtime, variants)
+    return variants
+
+def _file_fingerprint(filepath):
+    st = os.stat(filepath)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def _file_last_modified(filepath):
+    return datetime.fromtimestamp(int(os.path.getmtime(filepath)), tz=timezone.utc)
+
+def _is_not_modified(etag, last_modified=None):
+    """True when the request's validators show the client's copy is current.
+    If-None-Match wins over If-Modified-Since when both are sent."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def _with_cache_headers(response, etag, last_modified=None, max_age=ASSET_MAX_AGE, immutable=False):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE if immutable else max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+def _serve_variants(get_variants, available, mimetype, etag, last_modified=None, immutable=False):
+    """Serve whichever stored encoding the client accepts. Each encoding is a
+    distinct representation, so it gets its own ETag. `get_variants` is only
+    called once we know a body is needed."""
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), available)
+    if encoding:
+        etag = f"{etag}-{encoding}"
+    if _is_not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = Response(get_variants()[encoding or 'identity'], mimetype=mimetype)
+        if encoding:
+            response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return _with_cache_headers(response, etag, last_modified, immutable=immutable)
+
+def _serve_minified(filepath, minifier, mimetype):
+    etag = _file_fingerprint(filepath)
+    return _serve_variants(
+        lambda: get_minified(filepath, minifier), AVAILABLE_ENCODINGS, mimetype,
+        etag, _file_last_modified(filepath), immutable=request.args.get('v') == etag,
+    )
+
+def _serve_built(built, mimetype):
+    variants, fingerprint, immutable = built
+    available = [e for e in AVAILABLE_ENCODINGS if e in variants]
+    return _serve_variants(lambda: variants, available, mimetype, fingerprint, immutable=immutable)
+
+def render_cached_page(template_name, **context):
+    """Rendered, minified and compressed page output, cached per template mtime.
+
+    Only for pages whose context is a few hashable flags: each distinct
+    context gets its own entry, replaced whenever the template file changes.
+    A hit skips Jinja, minification and compression entirely.
+    """
+    mtime = os.path.getmtime(os.path.join(app.root_path, app.template_folder, template_name))
+    key = (template_name, tuple(sorted(context.items())))
+    cached = _page_cache.get(key)
+    if not cached or cached[0] != mtime:
+        # Minify Jinja's output as it streams rather than rendering the whole
+        # unminified document first.
+        html = ''.join(minify_stream(stream_template(template_name, **context))).encode('utf-8')
+        etag = hashlib.sha256(html).hexdigest()[:16]
+        cached = _page_cache[key] = (mtime, etag, compress_variants(html))
+    _, etag, variants = cached
+
+    response = _serve_variants(lambda: variants, AVAILABLE_ENCODINGS, 'text/html', etag)
+    # Pages can depend on the session, so browsers revalidate every time
+    # (cheap: a 304 from the ETag) and shared caches never store them.
+    response.cache_control.public = False
+    response.cache_control.max_age = None
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 #! serve our important routes
 @app.route('/')
 def index():
-    html = render_template('index.html', logged_in='user_uid' in session)
-    return minify_html(html)
+    return render_cached_page('index.html', logged_in='user_uid' in session)
 
 @app.route('/photos')
 def photos():
-    html = render_template('photos.html')
-    return minify_html(html)
+    return render_cached_page('photos.html')
 
 # Serve minified + obfuscated JS
 @app.route('/content/static/js/<path:filename>')
 def serve_js(filename):
+    built = get_built('js', filename)
+    if built:
+        return _serve_built(built, 'application/javascript')
     filepath = os.path.join(app.static_folder, 'js', filename)
     if not os.path.exists(filepath):
         return "Not found", 404
-    minified = get_minified(filepath, rjsmin.jsmin)
-    return Response(minified, mimetype='application/javascript')
+    import rjsmin
+    return _serve_minified(filepath, rjsmin.jsmin, 'application/javascript')
 
 # Serve minified CSS
 @app.route('/content/static/css/<path:filename>')
 def serve_css(filename):
+    built = get_built('css', filename)
+    if built:
+        return _serve_built(built, 'text/css')
     filepath = os.path.join(app.static_folder, 'css', filename)
     if not os.path.exists(filepath):
         return "Not found", 404
-    minified = get_minified(filepath, cssmin.cssmin)
-    return Response(minified, mimetype='text/css')
+    import cssmin
+    return _serve_minified(filepath, cssmin.cssmin, 'text/css')
 
 #! API endpoints
 @app.route('/api/images')
 def list_images():
     try:
-        if not storage_bucket:
+        if not get_storage_bucket():
             return jsonify({'error': 'Firebase Storage not initialized'}), 500
 
         images = []
-        # List all blobs with prefix 'images/'
-        blobs = storage_bucket.list_blobs(prefix='images/')
-
-        # Parse blobs to find images/{id}/{filename}.JPEG
-        image_map = {}
-        for blob in blobs:
-            parts = blob.name.split('/')
-            # Expected format: images/{id}/{filename}.JPEG
-            if len(parts) == 3 and parts[0] == 'images':
-                try:
-                    image_id = int(parts[1])
-                    filename = parts[2]
-                    # Only process JPEG files
-                    if filename.lower().endswith(('.jpeg', '.jpg')):
-                        # Remove extension for title
-                        title = filename.rsplit('.', 1)[0]
-                        image_map[image_id] = {
-                            'id': image_id,
-                            'title': title,
-                            'filename': filename
-                        }
-                except ValueError:
-                    continue
-
-        # Sort by ID and return as list
-        images = [image_map[key] for key in sorted(image_map.keys())]
+        for entry in image_index.all():
+            image = {
+                'id': entry['id'],
+                'title': entry['title'],
+                'filename': entry['filename'],
+                'bytes': entry['size'],
+                'version': str(entry['generation']),
+            }
+            if entry.get('description'):
+                image.update(entry['description'])
+                image['aspect_ratio'] = round(image['width'] / image['height'], 4)
+            images.append(image)
         return jsonify({'images': images})
 
     except Exception as e:
@@ -115,55 +211,175 @@ def list_images():
 #! routes go /content/static/<path>
 @app.route('/content/static/<path:filename>')
 def serve_static(filename):
-    return send_from_directory(app.static_folder, filename)
-
-@app.route('/images/<int:image_id>')
+    # send_from_directory already answers If-None-Match / If-Modified-Since
+    response = send_from_directory(app.static_folder, filename)
+    version = request.args.get('v')
+    if version and version == _file_fingerprint(os.path.join(app.static_folder, filename)):
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+def _image_cache_headers(response, entry, etag):
+    # The body depends on the Accept header, so shared caches must key on it.
+    response.vary.add('Accept')
+    immutable = request.args.get('v') == str(entry['generation'])
+    return _with_cache_headers(response, etag, entry['updated'], IMAGE_MAX_AGE, immutable)
+
+def _image_response(data, mimetype, cache_status, entry, etag):
+    response = Response(data, mimetype=mimetype)
+    response.headers['X-Cache'] = cache_status
+    return _image_cache_headers(response, entry, etag)
+
+def _image_head_response(key, mimetype, entry, prebuilt):
+    """HEAD answered from the index and cache alone: no download, no decode.
+    Content-Length is only sent when the rendition's size is already known."""
+    response = Response(mimetype=mimetype)
+    size = rendition_cache.size_of(key)
+    if size is None and prebuilt:
+        size = prebuilt['size']
+    if size is not None:
+        response.headers['Content-Length'] = str(size)
+    else:
+        # Don't let Werkzeug advertise the empty HEAD body as the length.
+        response.automatically_set_content_length = False
+    return _image_cache_headers(response, entry, key)
+
+@app.route('/images/<int:image_id>', methods=['GET', 'HEAD'])
 def serve_optimized_image(image_id):
     try:
-        if not storage_bucket:
+        if not get_storage_bucket():
             return "Firebase Storage not initialized", 500
 
-        quality = int(request.args.get('q', 75))
-        width = request.args.get('w')
+        requested = (request.args.get('w', type=int), request.args.get('q', type=int))
+        width, quality = canonical_params(*requested)
+        if requested != (width, quality) or set(request.args) - {'w', 'q', 'v'}:
+            if IMAGE_LADDER_MODE == 'reject':
+                return f"Unsupported size; use /images/{image_id}?w={width}&q={quality}", 400
+            canonical = url_for('serve_optimized_image', image_id=image_id, w=width, q=quality, v=request.args.get('v'))
+            response = redirect(canonical, 308)
+            response.cache_control.public = True
+            response.cache_control.max_age = 86400
+            return response
+
+        entry = image_index.get(image_id)
+        if not entry:
+            return "Image not found", 404
 
-        # List all blobs in images/{id}/ folder
-        prefix = f'images/{image_id}/'
-        blobs = list(storage_bucket.list_blobs(prefix=prefix))
+        fmt = negotiate_format(request.headers.get('Accept'))
+        mimetype = mimetype_for(fmt)
+
+        key = rendition_key(image_id, width, quality, entry['generation'], fmt)
+        prebuilt = image_index.prebuilt(entry, width, quality, fmt)
+        if _is_not_modified(key, entry['updated']):
+            return _image_cache_headers(Response(status=304), entry, key)
+        if request.method == 'HEAD':
+            return _image_head_response(key, mimetype, entry, prebuilt)
+
+        cached, tier = rendition_cache.get(key)
+        if cached is not None:
+            return _image_response(cached, mimetype, f'HIT-{tier.upper()}', entry, key)
+
+        def produce():
+            # Prefer a rendition built offline by scripts/generate_renditions.py
+            if prebuilt:
+                data = image_index.blob(prebuilt).download_as_bytes()
+                source = 'PREBUILT'
+            else:
+                image_bytes = image_index.blob(entry).download_as_bytes()
+                data = render(image_bytes, width, quality, fmt)
+                source = 'MISS'
+            rendition_cache.put(key, data)
+            return data, source
+
+        # Identical concurrent misses share one download + transform
+        (data, source), shared = rendition_flights.do(key, produce)
+        return _image_response(data, mimetype, 'COALESCED' if shared else source, entry, key)
+
+    except ImageTooLarge as e:
+        return str(e), 422
+    except (DecoderBusy, SingleFlightTimeout) as e:
+        return str(e), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return f"Error processing image: {str(e)}", 500
 
-        # Find the first JPEG file
-        jpeg_blob = None
-        for blob in blobs:
-            if blob.name.lower().endswith(('.jpeg', '.jpg')):
-                jpeg_blob = blob
-                break
 
-        if not jpeg_blob:
-            return "Image not found", 404
+@app.route('/api/images/exists')
+def images_exist():
+    """Batch existence check: ?ids=1,2,3 -> the subset that exists."""
+    try:
+        ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be integers'}), 400
+    if len(ids) > 200:
+        return jsonify({'error': 'At most 200 ids per request'}), 400
+    try:
+        if not get_storage_bucket():
+            return jsonify({'error': 'Firebase Storage not initialized'}), 500
+        return jsonify({'ids': [i for i in ids if image_index.get(i)]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Download the image to memory
-        image_bytes = jpeg_blob.download_as_bytes()
 
-        # Open and process the image
-        with Image.open(io.BytesIO(image_bytes)) as img:
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
+@app.route('/api/images/cache-stats')
+@require_admin
+def image_cache_stats():
+    return jsonify({
+        **rendition_cache.stats(),
+        'single_flight': rendition_flights.stats(),
+        'index': image_index.stats(),
+    })
 
-            if width:
-                width = int(width)
-                ratio = width / img.width
-                height = int(img.height * ratio)
-                img = img.resize((width, height), Image.Resampling.LANCZOS)
 
-            img_io = io.BytesIO()
-            img.save(img_io, 'JPEG', quality=quality, optimize=True)
-            img_io.seek(0)
+@app.route('/api/images/refresh', methods=['POST'])
+@require_admin
+def refresh_image_index():
+    try:
+        count = image_index.refresh()
+        described = image_index.describe_missing(IMAGE_DESCRIBE_BUDGET_SECONDS)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'ok': True, 'count': count, **described})
 
-            return Response(img_io.getvalue(), mimetype='image/jpeg')
 
-    except Exception as e:
-        return f"Error processing image: {str(e)}", 500
+# ── Server-Timing ──
+
+@app.after_request
+def _add_server_timing(response):
+    timing = server_timing()
+    if timing:
+        response.headers.add('Server-Timing', timing)
+    return response
+
+
+# ── Startup report ──
+
+# Modules that should only load on demand; the first-request line shows
+# which ones a request pulled in, so an eager import creeping back is visible.
+DEFERRED_MODULES = ('firebase_admin', 'google.cloud.firestore', 'stripe', 'googleapiclient', 'PIL', 'cssmin', 'rjsmin')
+
+_import_ms = (time.perf_counter() - _BOOT_STARTED) * 1000
+_first_request = {}
+
+
+@app.before_request
+def _time_first_request():
+    if not _first_request:
+        _first_request['started'] = time.perf_counter()
 
 
+@app.after_request
+def _report_first_request(response):
+    started = _first_request.get('started')
+    if started is not None and 'reported' not in _first_request:
+        _first_request['reported'] = True
+        now = time.perf_counter()
+        loaded = [m for m in DEFERRED_MODULES if m in sys.modules] or ['none']
+        print(
+            f"Startup: app import {_import_ms:.0f} ms; first request {request.method} {request.path} "
+            f"{(now - started) * 1000:.0f} ms ({(now - _BOOT_STARTED) * 1000:.0f} ms after boot); "
+            f"deferred modules loaded: {', '.join(loaded)}"
+        )
+    return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,81 @@
+"""Application-scoped clients shared by every request.
+
+Route handlers used to build a new BookingService (and look up the
+Firestore client) per request, and Stripe calls went out without an
+explicitly shared HTTP client. `services` creates each client once, on
+first use, and hands the same instance to every request:
+
+- one Firestore client. It multiplexes all calls over a single gRPC
+  channel, so there is no pool size to tune;
+- one Stripe HTTP client backed by a keep-alive requests.Session with
+  STRIPE_POOL_SIZE connections and a STRIPE_TIMEOUT timeout;
+- the process-wide Calendar client from calendar_service;
+- one BookingService wired to the above.
+
+Everything is created lazily, so importing this module stays cheap.
+"""
+import os
+import threading
+
+try:
+    from src.firebase_config import get_db
+except ImportError:
+    from firebase_config import get_db
+
+STRIPE_POOL_SIZE = int(os.getenv('STRIPE_POOL_SIZE', 10))
+STRIPE_TIMEOUT = float(os.getenv('STRIPE_TIMEOUT', 30))
+STRIPE_MAX_NETWORK_RETRIES = int(os.getenv('STRIPE_MAX_NETWORK_RETRIES', 2))
+
+
+class Services:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._db = None
+        self._stripe = None
+        self._booking = None
+
+    def db(self):
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    self._db = get_db()
+        return self._db
+
+    def stripe(self):
+        """The stripe module, keyed and routed through one pooled HTTP client."""
+        if self._stripe is None:
+            with self._lock:
+                if self._stripe is None:
+                    import requests
+                    import stripe
+
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=STRIPE_POOL_SIZE)
+                    session.mount('https://', adapter)
+                    stripe.api_key = os.getenv("STRIPE_API_KEY")
+                    stripe.max_network_retries = STRIPE_MAX_NETWORK_RETRIES
+                    stripe.default_http_client = stripe.RequestsClient(session=session, timeout=STRIPE_TIMEOUT)
+                    self._stripe = stripe
+        return self._stripe
+
+    def calendar(self):
+        try:
+            from src.calendar_service import calendar_client
+        except ImportError:
+            from calendar_service import calendar_client
+        return calendar_client
+
+    def booking(self):
+        if self._booking is None:
+            with self._lock:
+                if self._booking is None:
+                    try:
+                        from src.booking_service import BookingService
+                    except ImportError:
+                        from booking_service import BookingService
+                    self.stripe()
+                    self._booking = BookingService(db=self.db())
+        return self._booking
+
+
+services = Services()
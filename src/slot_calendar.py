@@ -0,0 +1,205 @@
+"""Materialised free-slot calendar: one Firestore document per month.
+
+slot_calendar/{YYYY-MM} holds every bookable slot in that month, already
+expanded from the availability windows with booked slots removed:
+
+    {
+        "key": "2026-06", "year": 2026, "month": 6,
+        "slots": {"2026-06-03 15:00": {date, start_time, end_time,
+                                       duration_minutes, day_of_week,
+                                       availability_id}, ...},
+        "booked": ["2026-06-10 16:00", ...],
+    }
+
+The slots API reads that one document. BookingService keeps it current by
+applying deltas (add/remove a window, book/release a slot) whenever
+availability or bookings change. A month with no document yet is built from
+availability and bookings on first read. scripts/rebuild_slot_calendar.py
+rebuilds documents from scratch if they ever drift.
+
+Past dates stay in the document and are filtered out at read time, so it
+never has to be rewritten just because a day passed.
+
+Only months from the current one to MONTHS_AHEAD later are stored. The
+slots API is public, so a request for any other month is built in memory
+and not written; otherwise anyone could create documents for arbitrary
+months, and every availability change would then have to update them.
+
+The functions here are pure: they build and mutate the document dicts, and
+BookingService does the reads and writes.
+"""
+import os
+from datetime import date, timedelta
+
+COLLECTION = "slot_calendar"
+
+# Months after the current one that get a stored document.
+MONTHS_AHEAD = int(os.getenv("SLOT_CALENDAR_MONTHS_AHEAD", 12))
+
+
+def month_key(year, month):
+    return f"{year}-{month:02d}"
+
+
+def slot_key(date_str, start_time):
+    return f"{date_str} {start_time}"
+
+
+def in_stored_window(year, month, today):
+    """Whether (year, month) is between today's month and MONTHS_AHEAD later."""
+    offset = (year - today.year) * 12 + (month - today.month)
+    return 0 <= offset <= MONTHS_AHEAD
+
+
+def month_bounds(year, month):
+    """First day of the month and of the next month, as YYYY-MM-DD strings."""
+    start = f"{year}-{month:02d}-01"
+    end = f"{year + 1}-01-01" if month == 12 else f"{year}-{month + 1:02d}-01"
+    return start, end
+
+
+def split_window(start_time, end_time, duration_minutes):
+    """Split a time window into individual lesson slots.
+    e.g., 15:00-18:00 with 60min -> [(15:00,16:00), (16:00,17:00), (17:00,18:00)]
+    """
+    sh, sm = map(int, start_time.split(':'))
+    eh, em = map(int, end_time.split(':'))
+    start_min = sh * 60 + sm
+    end_min = eh * 60 + em
+    slots = []
+    while start_min + duration_minutes <= end_min:
+        s = f"{start_min // 60:02d}:{start_min % 60:02d}"
+        e_min = start_min + duration_minutes
+        e = f"{e_min // 60:02d}:{e_min % 60:02d}"
+        slots.append((s, e))
+        start_min = e_min
+    return slots
+
+
+def split_availability(availability):
+    """{day_of_week: [(window, [(start, end), ...])]}: each window split once,
+    to be reused for every matching day in however many months."""
+    by_dow = {}
+    for window in availability:
+        times = split_window(window["start_time"], window["end_time"], window["duration_minutes"])
+        by_dow.setdefault(window["day_of_week"], []).append((window, times))
+    return by_dow
+
+
+def expand_split(by_dow, year, month, only_date=None):
+    """{slot_key: slot} for a month from split_availability() output.
+    `only_date` restricts the expansion to a single YYYY-MM-DD."""
+    day = date(year, month, 1)
+    slots = {}
+    while day.month == month:
+        date_str = day.isoformat()
+        dow = day.weekday()
+        if dow in by_dow and (only_date is None or date_str == only_date):
+            for window, times in by_dow[dow]:
+                for s_time, e_time in times:
+                    slots[slot_key(date_str, s_time)] = {
+                        "date": date_str,
+                        "start_time": s_time,
+                        "end_time": e_time,
+                        "duration_minutes": window["duration_minutes"],
+                        "day_of_week": dow,
+                        "availability_id": window["id"],
+                    }
+        day += timedelta(days=1)
+    return slots
+
+
+def expand_windows(availability, year, month, only_date=None):
+    """{slot_key: slot} for every window on its weekdays in the month."""
+    return expand_split(split_availability(availability), year, month, only_date)
+
+
+def build_month(by_dow, booked, year, month):
+    """A fresh month document from split_availability() output and booked (date, start_time) pairs."""
+    booked_keys = sorted(slot_key(d, t) for d, t in booked)
+    slots = expand_split(by_dow, year, month)
+    for key in booked_keys:
+        slots.pop(key, None)
+    return {
+        "key": month_key(year, month),
+        "year": year,
+        "month": month,
+        "slots": slots,
+        "booked": booked_keys,
+    }
+
+
+def months_between(start_date, end_date):
+    """(year, month) pairs covering two YYYY-MM-DD dates, inclusive."""
+    year, month = int(start_date[:4]), int(start_date[5:7])
+    last = (int(end_date[:4]), int(end_date[5:7]))
+    months = []
+    while (year, month) <= last:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def free_slots(doc, from_date=None, to_date=None):
+    """The document's free slots in chronological order, optionally within a date range."""
+    return [
+        slot for key, slot in sorted(doc["slots"].items())
+        if (from_date is None or slot["date"] >= from_date)
+        and (to_date is None or slot["date"] <= to_date)
+    ]
+
+
+def encode_compact(slots):
+    """Slots grouped by date, with the per-window fields stored once:
+
+        {"windows": [{"availability_id": ..., "duration_minutes": 60}, ...],
+         "days": {"2026-06-03": [["15:00", 0], ["16:00", 0]], ...}}
+
+    Each day entry is [start_time, index into windows]. The end time is
+    start + duration, and the weekday follows from the date.
+    """
+    windows, index, days = [], {}, {}
+    for slot in slots:
+        window = (slot["availability_id"], slot["duration_minutes"])
+        if window not in index:
+            index[window] = len(windows)
+            windows.append({"availability_id": window[0], "duration_minutes": window[1]})
+        days.setdefault(slot["date"], []).append([slot["start_time"], index[window]])
+    return {"windows": windows, "days": days}
+
+
+# ── Deltas ──
+
+def add_window(doc, window):
+    """A new availability window: add its slots, except those already booked."""
+    booked = set(doc["booked"])
+    for key, slot in expand_windows([window], doc["year"], doc["month"]).items():
+        if key not in booked:
+            doc["slots"][key] = slot
+
+
+def remove_window(doc, availability_id):
+    doc["slots"] = {
+        key: slot for key, slot in doc["slots"].items()
+        if slot["availability_id"] != availability_id
+    }
+
+
+def mark_booked(doc, keys):
+    """Newly booked slots; keys outside this document's month are ignored."""
+    booked = set(doc["booked"])
+    for key in keys:
+        if not key.startswith(doc["key"] + "-"):
+            continue
+        doc["slots"].pop(key, None)
+        booked.add(key)
+    doc["booked"] = sorted(booked)
+
+
+def release(doc, key, availability):
+    """A cancelled booking: free the slot again if a window still offers it."""
+    doc["booked"] = [k for k in doc["booked"] if k != key]
+    date_str = key.split(' ', 1)[0]
+    slot = expand_windows(availability, doc["year"], doc["month"], only_date=date_str).get(key)
+    if slot:
+        doc["slots"][key] = slot
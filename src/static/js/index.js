@@ -208,16 +208,31 @@
             img.style.width = '100%';
             img.style.display = 'block';
             img.style.borderRadius = '4px';
+
+            // Manifest dimensions let us reserve space and show the blur-up
+            // placeholder before the real image arrives.
+            if (entry.ratio) {
+                div.dataset.ratio = entry.ratio;
+                img.width = entry.width;
+                img.height = entry.height;
+                img.style.height = 'auto';
+                img.style.backgroundColor = entry.color || '';
+                if (entry.placeholder) {
+                    img.style.backgroundImage = `url(${entry.placeholder})`;
+                    img.style.backgroundSize = 'cover';
+                }
+            }
+
             div.appendChild(img);
             grid.appendChild(div);
 
-            // When image loads, calculate its position and fade in
+            // Calculate its position and fade in
             const place = () => {
                 const shortest = colHeights.indexOf(Math.min(...colHeights));
                 const x = shortest * (colWidth + GAP);
                 const y = colHeights[shortest];
 
-                const ratio = img.naturalHeight / (img.naturalWidth || 1);
+                const ratio = entry.ratio || img.naturalHeight / (img.naturalWidth || 1);
                 const itemHeight = colWidth * ratio;
 
                 div.style.left = x + 'px';
@@ -235,7 +250,10 @@
                 });
             };
 
-            if (img.complete && img.naturalHeight > 0) {
+            if (entry.ratio) {
+                place();
+                img.addEventListener('error', () => { div.remove(); relayoutGrid(grid); }, { once: true });
+            } else if (img.complete && img.naturalHeight > 0) {
                 place();
             } else {
                 img.addEventListener('load', place, { once: true });
@@ -267,7 +285,8 @@
 
         items.forEach(div => {
             const img = div.querySelector('img');
-            if (!img || !img.naturalHeight) return;
+            const knownRatio = parseFloat(div.dataset.ratio);
+            if (!img || (!knownRatio && !img.naturalHeight)) return;
 
             div.style.width = colWidth + 'px';
 
@@ -275,7 +294,7 @@
             const x = shortest * (colWidth + GAP);
             const y = colHeights[shortest];
 
-            const ratio = img.naturalHeight / (img.naturalWidth || 1);
+            const ratio = knownRatio || img.naturalHeight / (img.naturalWidth || 1);
             const itemHeight = colWidth * ratio;
 
             div.style.left = x + 'px';
@@ -304,8 +323,13 @@
             }
 
             populatePhotoGrid(grid, data.images.map(img => ({
-                src: `/images/${img.id}?w=600&q=80`,
-                alt: img.title
+                src: `/images/${img.id}?w=600&q=80&v=${img.version}`,
+                alt: img.title,
+                width: img.width,
+                height: img.height,
+                ratio: img.width && img.height ? img.height / img.width : null,
+                color: img.dominant_color,
+                placeholder: img.placeholder
             })));
         } catch {
             await fetchPhotosByIncrement(grid);
@@ -316,10 +340,26 @@
     async function fetchPhotosByIncrement(grid) {
         const ids = [];
         let id = 1;
+        let resolved = false;
+
+        // One batched existence check per 50 ids instead of a HEAD per id
+        const BATCH = 50;
+        try {
+            while (!resolved) {
+                const batch = Array.from({ length: BATCH }, (_, i) => id + i);
+                const res = await fetch(`/api/images/exists?ids=${batch.join(',')}`);
+                if (!res.ok) throw new Error('API error');
+                const found = new Set((await res.json()).ids);
+                while (found.has(id)) ids.push(id++);
+                resolved = id < batch[0] + BATCH;
+            }
+        } catch {
+            // Carry on probing one id at a time from wherever we got to
+        }
 
-        while (true) {
+        while (!resolved) {
             try {
-                const res = await fetch(`/images/${id}?w=1&q=10`, { method: 'HEAD' });
+                const res = await fetch(`/images/${id}?w=320&q=60`, { method: 'HEAD' });
                 if (!res.ok) break;
                 ids.push(id);
                 id++;
@@ -32,16 +32,58 @@
         dayDetail.style.display = 'none'; calContainer.style.display = 'block';
     });
 
+    // Months fetched per request; navigating stays local until past the range.
+    var PREFETCH_MONTHS = 3;
+
+    function monthParam(year, month) {
+        return year + '-' + String(month + 1).padStart(2, '0');
+    }
+
+    function addMinutes(time, minutes) {
+        var parts = time.split(':');
+        var total = parseInt(parts[0], 10) * 60 + parseInt(parts[1], 10) + minutes;
+        return String(Math.floor(total / 60)).padStart(2, '0') + ':' + String(total % 60).padStart(2, '0');
+    }
+
+    // Expand the compact range response ({windows, days}) into per-month slot lists.
+    function cacheRange(data, year, month) {
+        for (var i = 0; i < PREFETCH_MONTHS; i++) {
+            var y = year + Math.floor((month + i) / 12), m = (month + i) % 12;
+            slotsCache[y + '-' + m] = [];
+        }
+        Object.keys(data.days || {}).forEach(function (date) {
+            var parts = date.split('-');
+            var key = parseInt(parts[0], 10) + '-' + (parseInt(parts[1], 10) - 1);
+            var dow = (new Date(parts[0], parts[1] - 1, parts[2]).getDay() + 6) % 7;
+            data.days[date].forEach(function (entry) {
+                var pattern = data.windows[entry[1]];
+                slotsCache[key].push({
+                    date: date,
+                    start_time: entry[0],
+                    end_time: addMinutes(entry[0], pattern.duration_minutes),
+                    duration_minutes: pattern.duration_minutes,
+                    day_of_week: dow,
+                    availability_id: pattern.availability_id,
+                });
+            });
+        });
+    }
+
     function loadMonth() {
         var key = calYear + '-' + calMonth;
         calLabel.textContent = MONTHS_FULL[calMonth] + ' ' + calYear;
         if (slotsCache[key]) { allSlots = slotsCache[key]; renderCalendar(); updateStats(); return; }
         calBody.innerHTML = '<div class="cal-loading">loading...</div>';
-        fetch('/tutoring/api/slots?year=' + calYear + '&month=' + (calMonth + 1))
+        var year = calYear, month = calMonth;
+        var lastYear = year + Math.floor((month + PREFETCH_MONTHS - 1) / 12);
+        var lastMonth = (month + PREFETCH_MONTHS - 1) % 12;
+        fetch('/tutoring/api/slots?from=' + monthParam(year, month) + '&to=' + monthParam(lastYear, lastMonth))
             .then(function (r) { return r.json(); })
             .then(function (data) {
-                allSlots = data.slots || [];
-                slotsCache[key] = allSlots;
+                if (data.error) throw new Error(data.error);
+                cacheRange(data, year, month);
+                if (year !== calYear || month !== calMonth) return;
+                allSlots = slotsCache[key];
                 renderCalendar(); updateStats();
             })
             .catch(function () { calBody.innerHTML = '<div class="cal-loading">failed to load.</div>'; });
@@ -1,16 +1,25 @@
 import os
+import re
+import hmac
+import csv
+import io
+import json
 import functools
-from flask import Blueprint, render_template, jsonify, request, session, redirect, url_for
-import stripe
+from datetime import date, timedelta
+from flask import Blueprint, render_template, jsonify, request, session, redirect, url_for, Response, stream_with_context
 
 try:
     from src.firebase_config import verify_token, ADMIN_EMAIL, FIREBASE_WEB_CONFIG
-    from src.booking_service import BookingService
     from src.lesson_plans import get_all_plans, plan_for_session_count, TEACHING_NOTES
+    from src.services import services
+    from src.fanout import fan_out
+    from src import slot_calendar
 except ImportError:
     from firebase_config import verify_token, ADMIN_EMAIL, FIREBASE_WEB_CONFIG
-    from booking_service import BookingService
     from lesson_plans import get_all_plans, plan_for_session_count, TEACHING_NOTES
+    from services import services
+    from fanout import fan_out
+    import slot_calendar
 
 blueprint = Blueprint(
     "stripe_bluprnt", __name__,
@@ -20,11 +29,27 @@ blueprint = Blueprint(
 )
 
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+# Longest span /api/slots?from=&to= will return in one response.
+SLOTS_MAX_RANGE_DAYS = int(os.getenv("SLOTS_MAX_RANGE_DAYS", 186))
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
+# Shared secret for the scheduled job sweep. The scheduler sends it as
+# "Authorization: Bearer <CRON_SECRET>"; the endpoint is disabled without it.
+CRON_SECRET = os.getenv("CRON_SECRET")
+# Stop starting new jobs after this long, to stay inside the function timeout.
+JOB_SWEEP_BUDGET_SECONDS = float(os.getenv("JOB_SWEEP_BUDGET_SECONDS", 45))
+ADMIN_BOOKINGS_PAGE_SIZE = int(os.getenv("ADMIN_BOOKINGS_PAGE_SIZE", 50))
+BOOKING_CURSOR = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$")
+EXPORT_FIELDS = [
+    "id", "date", "start_time", "end_time", "duration_minutes", "status",
+    "user_email", "user_uid", "note", "calendar_status", "meet_link", "created_at",
+]
 
 
 def get_booking_service():
-    return BookingService()
+    # One BookingService for the process (see services.py). It is created on
+    # the first tutoring request, since booking_service pulls in Firestore,
+    # stripe and the Calendar client (~0.5 s of imports).
+    return services.booking()
 
 
 def require_auth(f):
@@ -65,14 +90,15 @@ def _user_context():
 def book():
     svc = get_booking_service()
     ctx = _user_context()
-    packages = svc.get_packages()
-    user_profile = None
+    calls = {"packages": svc.get_packages}
     if ctx["logged_in"]:
-        user_profile = svc.get_user_profile(session["user_uid"])
+        uid = session["user_uid"]
+        calls["profile"] = lambda: svc.get_user_profile(uid)
+    data = fan_out(**calls)
     return render_template(
         "tutoring_book.html",
-        packages=packages,
-        user_profile=user_profile,
+        packages=data["packages"],
+        user_profile=data.get("profile"),
         lesson_plans=get_all_plans(),
         teaching_notes=TEACHING_NOTES,
         **ctx,
@@ -84,9 +110,13 @@ def book():
 def account():
     svc = get_booking_service()
     ctx = _user_context()
-    user_profile = svc.get_user_profile(session["user_uid"])
-    bookings = svc.get_user_bookings(session["user_uid"])
-    purchases = svc.get_user_purchases(session["user_uid"])
+    uid = session["user_uid"]
+    data = fan_out(
+        profile=lambda: svc.get_user_profile(uid),
+        bookings=lambda: svc.get_user_bookings(uid),
+        purchases=lambda: svc.get_user_purchases(uid),
+    )
+    user_profile, bookings, purchases = data["profile"], data["bookings"], data["purchases"]
 
     # Show the curriculum tailored to what they booked. The arc size is the
     # larger of the sessions they've actually booked (confirmed/completed) and
@@ -126,8 +156,77 @@ def auth_page():
 def admin_page():
     svc = get_booking_service()
     availability = svc.get_availability()
-    bookings = svc.get_all_confirmed_bookings()
-    return render_template("tutoring_admin.html", availability=availability, bookings=bookings, **_user_context())
+    after = request.args.get("after")
+    if after and not BOOKING_CURSOR.match(after):
+        after = None
+    bookings, next_cursor = svc.get_confirmed_bookings_page(after=after, limit=ADMIN_BOOKINGS_PAGE_SIZE)
+    return render_template(
+        "tutoring_admin.html",
+        availability=availability,
+        bookings=bookings,
+        bookings_after=after,
+        bookings_next=next_cursor,
+        today=date.today().isoformat(),
+        **_user_context(),
+    )
+
+
+def _export_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+# Spreadsheets run cells starting with these as formulas; note and
+# user_email are user-supplied, so such cells are quoted with a leading '.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    value = _export_value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+@blueprint.route("/admin/bookings/export")
+@require_admin
+def admin_bookings_export():
+    """?from=&to= (YYYY-MM or YYYY-MM-DD; from defaults to today, to to
+    open-ended), &format=csv|ndjson, optional &status=. Rows are written as
+    Firestore returns them, so large ranges aren't held in memory."""
+    start = _parse_range_bound(request.args.get("from") or date.today().isoformat())
+    end = _parse_range_bound(request.args.get("to") or "9999-12-31", end=True)
+    fmt = request.args.get("format", "csv")
+    if not start or not end or end < start or fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "from and to must be YYYY-MM or YYYY-MM-DD with from <= to; format csv or ndjson"}), 400
+
+    rows = get_booking_service().iter_bookings(start, end, status=request.args.get("status") or None)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for booking in rows:
+            writer.writerow([_csv_cell(booking.get(field, "")) for field in EXPORT_FIELDS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def generate_ndjson():
+        for booking in rows:
+            yield json.dumps({field: _export_value(booking.get(field)) for field in EXPORT_FIELDS}) + "\n"
+
+    if fmt == "csv":
+        body, mimetype = generate_csv(), "text/csv"
+    else:
+        body, mimetype = generate_ndjson(), "application/x-ndjson"
+    filename = f"bookings-{start}-to-{end}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 # ── Auth API ──
@@ -160,8 +259,36 @@ def logout():
 
 # ── Slots API ──
 
+def _parse_range_bound(value, end=False):
+    """YYYY-MM-DD as given; YYYY-MM as the first (or, for `end`, last) day of the month."""
+    try:
+        if len(value) == 7:
+            first = date.fromisoformat(value + "-01")
+            if not end:
+                return first.isoformat()
+            next_month = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+            return (next_month - timedelta(days=1)).isoformat()
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
 @blueprint.route("/api/slots")
 def api_slots():
+    """?year=&month= returns one month's slots as a list of dicts.
+    ?from=&to= (YYYY-MM or YYYY-MM-DD, at most SLOTS_MAX_RANGE_DAYS apart)
+    returns the range in the compact encoding from slot_calendar.encode_compact."""
+    if "from" in request.args or "to" in request.args:
+        start = _parse_range_bound(request.args.get("from"))
+        end = _parse_range_bound(request.args.get("to"), end=True)
+        if not start or not end or end < start:
+            return jsonify({"error": "from and to must be YYYY-MM or YYYY-MM-DD, with from <= to"}), 400
+        if (date.fromisoformat(end) - date.fromisoformat(start)).days >= SLOTS_MAX_RANGE_DAYS:
+            return jsonify({"error": f"Range is limited to {SLOTS_MAX_RANGE_DAYS} days"}), 400
+        svc = get_booking_service()
+        slots = svc.get_available_range(start, end)
+        return jsonify({"from": start, "to": end, **slot_calendar.encode_compact(slots)})
+
     year = request.args.get("year", type=int)
     month = request.args.get("month", type=int)
     if not year or not month:
@@ -229,8 +356,12 @@ def checkout():
         return jsonify({"error": "Missing package_id"}), 400
 
     svc = get_booking_service()
-    packages = svc.get_packages()
-    package = next((p for p in packages if p["id"] == package_id), None)
+    uid = session["user_uid"]
+    try:
+        data = fan_out(packages=svc.get_packages, profile=lambda: svc.get_user_profile(uid))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    package = next((p for p in data["packages"] if p["id"] == package_id), None)
     if not package:
         return jsonify({"error": "Package not found"}), 404
 
@@ -239,7 +370,7 @@ def checkout():
 
     try:
         # Get Stripe customer ID if available
-        user_profile = svc.get_user_profile(session["user_uid"])
+        user_profile = data["profile"]
         stripe_customer_id = user_profile.get("stripe_customer_id") if user_profile else None
 
         checkout_kwargs = {
@@ -258,6 +389,7 @@ def checkout():
         if stripe_customer_id:
             checkout_kwargs["customer"] = stripe_customer_id
 
+        stripe = services.stripe()
         checkout_session = stripe.checkout.Session.create(**checkout_kwargs)
         svc.create_purchase(
             user_uid=session["user_uid"],
@@ -277,6 +409,7 @@ def checkout():
 
 @blueprint.route("/webhook", methods=["POST"])
 def webhook():
+    stripe = services.stripe()
     payload = request.get_data()
     sig_header = request.headers.get("Stripe-Signature")
     try:
@@ -321,3 +454,27 @@ def admin_delete_availability(avail_id):
     svc = get_booking_service()
     svc.delete_availability(avail_id)
     return jsonify({"ok": True})
+
+
+@blueprint.route("/admin/calendar-stats")
+@require_admin
+def admin_calendar_stats():
+    return jsonify(services.calendar().stats())
+
+
+@blueprint.route("/admin/job-stats")
+@require_admin
+def admin_job_stats():
+    return jsonify(get_booking_service().jobs.stats())
+
+
+@blueprint.route("/admin/run-jobs", methods=["GET", "POST"])
+def admin_run_jobs():
+    """Run due background jobs (calendar/Meet provisioning). Called every
+    minute by an external scheduler (see .env.example) with the CRON_SECRET
+    bearer token."""
+    expected = f"Bearer {CRON_SECRET}" if CRON_SECRET else None
+    if not expected or not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+        return jsonify({"error": "Unauthorized"}), 401
+    results = get_booking_service().jobs.run_due(budget_seconds=JOB_SWEEP_BUDGET_SECONDS)
+    return jsonify({"ok": True, "results": results})